@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import yaml
+
+from syllabus import Assets, Cycle, Fragment, Loader, Manifest, Schemata, Tools
+from typing import Any, Callable
+
+
+def measure(func: Callable[[], Any], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list[float], size: int | None = None, reference: float | None = None) -> None:
+    best = min(timings)
+    line = f'{name:<24} best {best * 1000:9.2f} ms   mean {statistics.mean(timings) * 1000:9.2f} ms'
+    if size is not None:
+        line += f'   {size / best / 1e6:7.2f} MB/s'
+    if reference is not None:
+        line += f'   x{reference / best:.2f}'
+    print(line)
+
+
+def peak_rss() -> int:
+    # whole process, since it started: kilobytes on linux, bytes on macos
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def traced(func: Callable[[], Any]) -> tuple[Any, int]:
+    # result of func and the peak of the python allocations made during the call, above what was
+    # allocated before it
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return value, peak - before
+
+
+def quiet(func: Callable[[], Any]) -> Callable[[], Any]:
+    # what the loaders and renderers print (every file with --verbose) would be timed with them
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+# synthetic corpus: same layout, schemata and orders of magnitude as src/23, every code used in a
+# page title or a navigation entry is taken from templates/mapping.yml
+class Corpus:
+    CYCLES = ['PA', 'PC']
+    SEMESTERS = ['S1', 'S2']
+    UES = ['ALGO', 'IP', 'MATH', 'SH', 'SI']
+    GROUPS = ['PROG', 'PROJ', 'ELEC', 'ARCHI', 'PHYS', 'NTS']
+    LEVELS = ['L1', 'L2', 'L3']
+    ACTIVITIES = ['lecture', 'remediation', 'tutorial', 'practical', 'personnal']
+    EVALUATIONS = ['exam', 'project', 'report', 'defense', 'exercices']
+    ENVIRONMENTS = ['exam-room', 'computer-room', 'intranet', 'autonomous', 'classroom']
+    WORDS = ('algorithme structure donnée graphe arbre pile file tableau matrice vecteur fonction récursion preuve '
+             'invariant complexité programme compilation mémoire processeur signal circuit énergie champ onde '
+             'intégrale dérivée suite série limite espace base noyau image projet rapport méthode analyse').split()
+    MATH = [r'$O(n \log n)$', r'$\sum_{k=0}^{n} k = \frac{n(n+1)}{2}$', r'$f : \mathbb{R} \to \mathbb{R}$',
+            r'$$\int_a^b f(x)\,dx = F(b) - F(a)$$', r'$\vec{E} = -\nabla V$', r'$A = P D P^{-1}$']
+
+    class Dumper(yaml.SafeDumper):
+        pass
+
+    @staticmethod
+    def block(dumper: yaml.SafeDumper, value: str) -> yaml.Node:
+        # multi-line fields are written as literal blocks, like the hand-written sources
+        return dumper.represent_scalar('tag:yaml.org,2002:str', value, style='|' if '\n' in value else None)
+
+    def __init__(self, seed: int = 0):
+        self.random: random.Random = random.Random(seed)
+        Corpus.Dumper.add_representer(str, Corpus.block)
+
+    def sentence(self, words: int) -> str:
+        result = ' '.join(self.random.choice(Corpus.WORDS) for _ in range(words))
+        if self.random.random() < 0.2:
+            result += ' ' + self.random.choice(Corpus.MATH)
+        if self.random.random() < 0.2:
+            result += f' `{self.random.choice(Corpus.WORDS)}()`'
+        return result.capitalize()
+
+    def markdown(self, size: int) -> str:
+        # paragraphs, nested lists and, now and then, a table, up to about size characters
+        parts = []
+        length = 0
+        while length < size:
+            match self.random.choice(['paragraph', 'list', 'list', 'table'] if size > 600 else ['paragraph', 'list']):
+                case 'paragraph':
+                    part = self.sentence(self.random.randint(8, 30)) + '.'
+                case 'list':
+                    items = []
+                    for _ in range(self.random.randint(2, 6)):
+                        items.append(f'- {self.sentence(self.random.randint(3, 12))}')
+                        if self.random.random() < 0.3:
+                            items.append(f'  - {self.sentence(self.random.randint(3, 8))}')
+                    part = '\n'.join(items)
+                case _:
+                    columns = self.random.randint(2, 4)
+                    rows = [' | '.join(self.sentence(2) for _ in range(columns)) for _ in range(self.random.randint(2, 8))]
+                    part = '\n'.join([rows[0], ' | '.join(['---'] * columns)] + rows[1:])
+            parts.append(part)
+            length += len(part)
+        return '\n\n'.join(parts) + '\n'
+
+    def ecue(self) -> dict[str, Any]:
+        result = {
+            'information': {
+                'label': self.sentence(self.random.randint(2, 6)),
+                'coefficient': self.random.randint(1, 4),
+                'threshold': self.random.choice([0, 5, 6, 8]),
+                'referents': [f'{self.random.choice(Corpus.WORDS).capitalize()} {self.random.choice(Corpus.WORDS).upper()}' for _ in range(self.random.randint(1, 3))]
+            }
+        }
+        if self.random.random() < 0.7:
+            result['prerequisites'] = [self.sentence(self.random.randint(2, 8)) for _ in range(self.random.randint(1, 6))]
+        result['summary'] = self.markdown(self.random.randint(100, 700))
+        if self.random.random() < 0.9:
+            result['outline'] = self.markdown(self.random.randint(100, 800))
+        if self.random.random() < 0.9:
+            result['tlo'] = self.markdown(self.random.randint(150, 750))
+        result['activities'] = [{
+            'kind': kind,
+            'hours': self.random.choice([2, 4, 6, 10, 12, 18, 24, 1.5]),
+            'label': self.sentence(self.random.randint(2, 8))
+        } for kind in self.random.sample(Corpus.ACTIVITIES, self.random.randint(1, 5))]
+        count = self.random.randint(1, 4)
+        result['evaluations'] = [{
+            'kind': self.random.choice(Corpus.EVALUATIONS),
+            'environment': self.random.choice(Corpus.ENVIRONMENTS),
+            'hours': self.random.choice([0.5, 1, 1.5, 2, 3]),
+            'code': f'EXAM-{idx + 1}',
+            'coefficient': round(1 / count, 4),
+            'label': self.sentence(self.random.randint(1, 4)),
+            **({'comments': self.sentence(self.random.randint(4, 12))} if self.random.random() < 0.3 else {})
+        } for idx in range(count)]
+        if self.random.random() < 0.25:
+            result['references'] = [self.random.choice([
+                {'kind': 'link', 'url': f'https://example.org/{self.random.choice(Corpus.WORDS)}', 'label': self.sentence(4)},
+                {'kind': 'book', 'isbn-13': f'978-{self.random.randrange(10 ** 10):010}', 'label': self.sentence(5)},
+                {'kind': 'other', 'label': self.sentence(6)}
+            ]) for _ in range(self.random.randint(1, 4))]
+        if self.random.random() < 0.05:
+            result['others'] = self.markdown(self.random.randint(200, 900))
+        return result
+
+    def ue(self) -> dict[str, Any]:
+        return {
+            'information': {
+                'label': self.sentence(self.random.randint(2, 5)),
+                'level': self.random.choice(Corpus.LEVELS),
+                'ects': self.random.randint(1, 8),
+                'coordinator': f'{self.random.choice(Corpus.WORDS).capitalize()} {self.random.choice(Corpus.WORDS).upper()}'
+            },
+            'description': self.markdown(self.random.randint(600, 2600))
+        }
+
+    def write(self, filepath: str, data: Any) -> int:
+        content = yaml.dump(data, Dumper=Corpus.Dumper, allow_unicode=True, sort_keys=False, width=1 << 16)
+        with open(filepath, 'w') as f:
+            f.write(content)
+        return len(content.encode('utf-8'))
+
+    def generate(self, root: str, scale: int) -> dict[str, int]:
+        # scale 1 is about the size of src/23: two cycles of ten UE and about 45 ECUE each
+        counts = {'years': scale, 'cycles': 0, 'ue': 0, 'ecue': 0, 'bytes': 0}
+        for year in range(23, 23 + scale):
+            for cycle in Corpus.CYCLES:
+                directory = os.path.join(root, str(year), cycle)
+                os.makedirs(directory)
+                counts['bytes'] += self.write(os.path.join(directory, '.preamble.yml'), {'description': self.markdown(1500)})
+                counts['cycles'] += 1
+                for semester in Corpus.SEMESTERS:
+                    for ue in Corpus.UES:
+                        code = f'{year}-{cycle}-{semester}-{ue}'
+                        os.makedirs(os.path.join(directory, code))
+                        counts['bytes'] += self.write(os.path.join(directory, code, '.ue.yml'), self.ue())
+                        counts['ue'] += 1
+                        for idx in range(self.random.randint(2, 7)):
+                            name = f'{ue}-{semester}-{idx + 1}-{self.random.choice(Corpus.WORDS).upper()}'
+                            if self.random.random() < 0.15:
+                                # grouped ECUE (5 parts), listed under a sub-menu of the UE
+                                name = f'{ue}-{semester}-{self.random.choice(Corpus.GROUPS)}-{idx + 1}-{self.random.choice(Corpus.WORDS).upper()}'
+                            counts['bytes'] += self.write(os.path.join(directory, code, f'{name}.yml'), self.ecue())
+                            counts['ecue'] += 1
+        return counts
+
+
+def bench_yaml(manifest: Manifest, repeat: int) -> None:
+    contents = []
+    for source in manifest.sources:
+        with open(source.filepath) as f:
+            contents.append(f.read())
+    size = sum(len(content.encode('utf-8')) for content in contents)
+    print(f'yaml: {len(contents)} files, {size / 1e6:.2f} MB, {repeat} runs')
+
+    loaders = {'python (SafeLoader)': yaml.SafeLoader}
+    if yaml.__with_libyaml__:
+        loaders['libyaml (CSafeLoader)'] = yaml.CSafeLoader
+    else:
+        print('libyaml bindings are not available, only the pure python loader is measured')
+
+    expected = None
+    reference = None
+    for name, loader in loaders.items():
+        # repr keeps the types (int/float, date/str, ...) so both loaders must agree on them too
+        parsed = [repr(Tools.parse_yaml(content, loader)) for content in contents]
+        if expected is None:
+            expected = parsed
+        elif parsed != expected:
+            raise AssertionError(f'{name} does not produce the same data as the pure python loader')
+
+        timings = measure(lambda: [Tools.parse_yaml(content, loader) for content in contents], repeat)
+        report(name, timings, size, reference)
+        if reference is None:
+            reference = min(timings)
+
+
+def bench_phases(root: str, repeat: int) -> dict[str, Any]:
+    # every phase of a build, measured on its own from the output of the previous one
+    results = {}
+
+    def phase(name: str, func: Callable[[], Any], size: int | None = None) -> Any:
+        # the first call is traced, the timed ones are not slowed down by tracemalloc
+        value, memory = traced(func)
+        timings = measure(func, repeat)
+        report(name, timings, size)
+        results[name] = {'best': min(timings), 'mean': statistics.mean(timings), 'runs': repeat, 'peak_memory': memory}
+        if size is not None:
+            results[name]['bytes'] = size
+        return value
+
+    manifest = phase('discovery', lambda: Manifest.scan(root))
+    contents = []
+    for source in manifest.sources:
+        with open(source.filepath, 'rb') as f:
+            contents.append(f.read())
+    size = sum(len(content) for content in contents)
+    print(f'phases: {len(manifest.sources)} files, {size / 1e6:.2f} MB, {len(manifest.cycles())} cycles, {repeat} runs')
+
+    data = phase('parse', lambda: [Tools.parse_yaml(content) for content in contents], size)
+    checked = [(source, item) for source, item in zip(manifest.sources, data) if source.schema is not None]
+    phase('validation', lambda: [Schemata.validate(item, source.schema, source.filepath) for source, item in checked])
+
+    def assemble() -> dict[tuple[str, str], Cycle]:
+        syllabus = {}
+        for source, item in zip(manifest.sources, data):
+            Tools.store(syllabus, Loader.build(source, item), source)
+        return {(year, cycle): Cycle.assemble(cycle, syllabus[year][cycle]).summarize() for year in sorted(syllabus) for cycle in sorted(syllabus[year])}
+    cycles = phase('assembly', quiet(assemble))
+    ues = [ue for cycle in cycles.values() for semester in cycle.semesters.values() for ue in semester.ues.values()]
+    ecues = [ecue for ue in ues for ecue in ue.flatten()]
+
+    def markdown() -> None:
+        # cold cache: every markdown field is rendered again
+        Tools.convert.cache_clear()
+        for ecue in ecues:
+            for content in [ecue.summary, ecue.outline, ecue.tlo, ecue.others] + (ecue.prerequisites or []):
+                if content is not None:
+                    Tools.render(content)
+            for item in ecue.activities:
+                if item.label is not None:
+                    Tools.render(item.label)
+            for item in ecue.evaluations:
+                if item.comments is not None:
+                    Tools.render(item.comments)
+    phase('markdown', markdown)
+    phase('recap', lambda: [''.join(cycle.recap.display(cycle)._render([], 0, '  ', True, False)) for cycle in cycles.values()])
+    phase('serialisation', quiet(lambda: [''.join(item.render()._render([], 0, '  ', True, False)) for item in ues + ecues]))
+
+    # pages are written to a scratch directory: the digests used in fragment keys and the assets are
+    # resolved while the working directory is still the repository
+    Fragment.cache = None
+    Assets.load()
+    Tools.digest('templates/mapping.yml')
+    for ecue in ecues:
+        Tools.digest(ecue.filepath)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='syllabus-bench-') as scratch:
+        os.chdir(scratch)
+        try:
+            phase('write', quiet(lambda: [cycle.display(year, 'benchmark') for (year, _), cycle in cycles.items()]))
+            written = sum(os.path.getsize(Cycle.output(year, cycle)) for year, cycle in cycles)
+        finally:
+            os.chdir(cwd)
+    results['write']['bytes'] = written
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EPITA syllabus generator benchmarks')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='number of runs per benchmark')
+    parser.add_argument('--src', default='src', help='corpus root directory')
+    parser.add_argument('--scale', type=int, default=0, help='benchmark a synthetic corpus of this many times src/23 instead of --src')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic corpus')
+    parser.add_argument('--keep', metavar='DIR', help='write the synthetic corpus to DIR and keep it')
+    parser.add_argument('--json', metavar='FILE', help='write the phase results to FILE')
+    args = parser.parse_args()
+
+    Tools.load_mapping('templates/mapping.yml')
+    root = os.path.abspath(args.src)
+    scratch = None
+    corpus = None
+    if args.scale > 0:
+        if args.keep is not None:
+            root = os.path.abspath(args.keep)
+        else:
+            scratch = tempfile.mkdtemp(prefix='syllabus-corpus-')
+            root = scratch
+        start = time.perf_counter()
+        corpus = Corpus(args.seed).generate(root, args.scale)
+        print(f'generated x{args.scale} corpus in {root}: {corpus["cycles"]} cycles, {corpus["ue"]} UE, {corpus["ecue"]} ECUE, {corpus["bytes"] / 1e6:.2f} MB in {time.perf_counter() - start:.2f} s')
+
+    try:
+        bench_yaml(Manifest.scan(root), args.repeat)
+        phases = bench_phases(root, args.repeat)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch)
+
+    print(f'peak rss: {peak_rss() / 1e6:.1f} MB')
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'libyaml': bool(yaml.__with_libyaml__),
+                'scale': args.scale,
+                'seed': args.seed if args.scale > 0 else None,
+                'corpus': corpus,
+                'phases': phases,
+                'peak_rss': peak_rss()
+            }, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
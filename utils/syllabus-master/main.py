@@ -14,6 +14,11 @@ from dominate.util import raw
 
 from jsonschema import RefResolver
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 formatting = {
     'css': {
@@ -46,7 +51,7 @@ def load_yaml(filepath: str, schema: str):
     resolver = RefResolver(base_uri=f'file://{schema_directory}', referrer={})
 
     with open(filepath) as data:
-        data = yaml.safe_load(data)
+        data = yaml.load(data, Loader=SafeLoader)
     js = json.loads(json.dumps(data))
     with open(os.path.join(schema_directory, schema)) as template:
         schema = json.load(template)
@@ -64,7 +69,7 @@ def separate():
 
 def load_mapping():
     with open('templates/mapping.yml', 'r') as f:
-        data = yaml.safe_load(f.read())
+        data = yaml.load(f.read(), Loader=SafeLoader)
     return data
 
 
@@ -495,7 +500,7 @@ def build_ues(mapping, stats_ue, year, cycle):
         add(ues_data, _s, [])
         with open(file, 'r') as f:
             data = f.read()
-        data = yaml.safe_load(data)
+        data = yaml.load(data, Loader=SafeLoader)
         ues_data[_s].append({'file': file, 'content': data, 'code': ue, 'clabel': _c})
 
     ues = []
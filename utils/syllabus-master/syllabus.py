@@ -2,29 +2,180 @@ from __future__ import annotations
 
 import math
 
+import argparse
+import contextlib
+import cProfile
+import dominate.dom_tag
 import dominate.util
 import dominate.tags as dt
 import dominate.util as du
+import gzip
+import hashlib
+import http.server
+import io
 import json
 import jsonschema
 import mistune
 import os
+import pickle
+import pstats
 import re
+import shutil
 import subprocess
+import threading
+import time
+import tracemalloc
+import unicodedata
 import yaml
 
-from datetime import datetime
-from jsonschema import RefResolver
-from typing import Any
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from itertools import combinations
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT7
+from typing import Any, Callable
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# wall/CPU timers and counters of a build, dumped as JSON at its end; work done on a process pool is
+# captured in the worker and merged back by the main process
+class Metrics:
+    counters: dict[str, int] = {}
+    timers: dict[str, list[float]] = {}
+    started: tuple[float, float] = (0.0, 0.0)
+
+    @staticmethod
+    def reset() -> None:
+        Metrics.counters = {}
+        Metrics.timers = {}
+        Metrics.started = (time.perf_counter(), time.process_time())
+
+    @staticmethod
+    def count(name: str, value: int = 1) -> None:
+        Metrics.counters[name] = Metrics.counters.get(name, 0) + value
+
+    @staticmethod
+    @contextlib.contextmanager
+    def timer(name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = Metrics.timers.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += time.perf_counter() - wall
+            entry[1] += time.process_time() - cpu
+            entry[2] += 1
+
+    @staticmethod
+    @contextlib.contextmanager
+    def capture():
+        saved = Metrics.counters, Metrics.timers
+        Metrics.counters, Metrics.timers = {}, {}
+        result = {}
+        try:
+            yield result
+        finally:
+            result['counters'], result['timers'] = Metrics.counters, Metrics.timers
+            Metrics.counters, Metrics.timers = saved
+
+    @staticmethod
+    def merge(captured: dict[str, Any]) -> None:
+        for name, value in captured['counters'].items():
+            Metrics.count(name, value)
+        for name, (wall, cpu, calls) in captured['timers'].items():
+            entry = Metrics.timers.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += calls
+
+    @staticmethod
+    def dump(filepath: str, **extra: Any) -> None:
+        result = {
+            'wall': time.perf_counter() - Metrics.started[0],
+            'cpu': time.process_time() - Metrics.started[1],
+            'counters': dict(sorted(Metrics.counters.items())),
+            'timers': {name: {'wall': wall, 'cpu': cpu, 'calls': calls} for name, (wall, cpu, calls) in sorted(Metrics.timers.items())}
+        } | extra
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(result, f, indent=1)
+
+
+# --profile: cProfile and tracemalloc around a whole build, the statistics are dumped next to the
+# metrics and the top entries printed
+class Profile:
+    __slots__ = ['filepath', 'profiler']
+
+    def __init__(self, filepath: str = '.cache/profile.pstats'):
+        self.filepath: str = filepath
+        self.profiler: cProfile.Profile = cProfile.Profile()
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self.profiler.enable()
+
+    def stop(self, top: int = 25) -> dict[str, Any]:
+        self.profiler.disable()
+        os.makedirs(os.path.dirname(self.filepath) or '.', exist_ok=True)
+        self.profiler.dump_stats(self.filepath)
+        pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(top)
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics('lineno')[:top]
+        tracemalloc.stop()
+        print(f'profile: {self.filepath}, traced memory peak {peak / 1e6:.1f} MB')
+        return {
+            'profile': self.filepath,
+            'memory': {
+                'current': current,
+                'peak': peak,
+                'top': [{'location': str(item.traceback[0]), 'size': item.size, 'count': item.count} for item in statistics]
+            }
+        }
 
 
 class Tools:
     mapping: dict[str, str]
+    digests: dict[str, str] = {}
+    verbose: bool = False
+
+    @staticmethod
+    def log(message: str) -> None:
+        # per file messages, only with --verbose
+        if Tools.verbose:
+            print(message)
+
+    @staticmethod
+    def parse_yaml(stream: Any, loader: type = SafeLoader) -> Any:
+        # libyaml when available, pure python otherwise: both share the safe constructor and resolver
+        return yaml.load(stream, Loader=loader)
 
     @staticmethod
     def load_mapping(filepath: str):
         with open(filepath, 'r') as f:
-            Tools.mapping = yaml.safe_load(f.read())
+            Tools.mapping = Tools.parse_yaml(f.read())
+
+    @staticmethod
+    def digest(filepath: str) -> str:
+        if filepath not in Tools.digests:
+            with open(filepath, 'rb') as f:
+                Tools.digests[filepath] = hashlib.sha256(f.read()).hexdigest()
+        return Tools.digests[filepath]
 
     @staticmethod
     def tr(key: str) -> str:
@@ -33,138 +184,1535 @@ class Tools:
     @staticmethod
     def load_yaml(filepath: str, schema: str | None = None) -> Any:
         with open(filepath) as f:
-            data = yaml.safe_load(f)
+            data = Tools.parse_yaml(f)
         if schema is not None:
-            # TODO migrate to referencing
-            root = os.path.dirname(__file__)
-            schema_directory = os.path.join(root, 'templates/schemata/')
-            resolver = RefResolver(base_uri=f'file://{schema_directory}', referrer={})
-            jsdata = json.loads(json.dumps(data))
-            with open(os.path.join(schema_directory, schema)) as template:
-                schema = json.load(template)
-            jsonschema.validate(jsdata, schema, resolver=resolver)
+            Schemata.validate(data, schema, filepath)
         return data
 
     @staticmethod
-    def get_code(filepath: str):
-        code = filepath.split('/')[-1].split('.')[0]
-        if code == '':
-            code = filepath.split('/')[-2]
-        return code
-
-    @staticmethod
-    def store(syllabus: dict, value: Any, filepath: str) -> None:
-        splits = ('.'.join(filepath.split('.')[:-1])).split('/')
-
-        year = splits[1]
-        cycle = splits[2]
+    def store(syllabus: dict, value: Any, source: Source) -> None:
+        year = source.year
+        cycle = source.cycle
 
         if year not in syllabus:
             syllabus[year] = {}
         if cycle not in syllabus[year]:
             syllabus[year][cycle] = {}
 
-        ue = splits[3]
-        if ue == '.preamble':
+        if source.kind == Source.PREAMBLE:
             syllabus[year][cycle]['preamble'] = value
             return
-        semester = ue.split('-')[2]
+        semester = source.semester
+        ue = source.ue
         if semester not in syllabus[year][cycle]:
             syllabus[year][cycle][semester] = {}
         if ue not in syllabus[year][cycle][semester]:
             syllabus[year][cycle][semester][ue] = {}
 
-        ecue = splits[4]
-        if ecue == '.ue':
+        if source.kind == Source.UE:
             syllabus[year][cycle][semester][ue]['preamble'] = value
             return
 
-        syllabus[year][cycle][semester][ue][ecue] = value
+        syllabus[year][cycle][semester][ue][source.code] = value
+
+    # html tags allowed in markdown fields, any other tag is escaped
+    ALLOWED = re.compile('<(?:' + '|'.join([
+        r'a', r'a\s+href=.*',                   # html link
+        r'img',                                 # images
+        r'i', r'em',                            # italic, emphasis
+        r'b', r'strong',                        # bold, strong
+        r'p',                                   # paragraph
+        r'u',                                   # underline
+        r'h[1-6]',                              # headers
+        r'ul', r'ol', r'li',                    # list, numbered or not
+        r'br', r'hr',                           # new-line,
+        r'code', r'pre', r'pre\s+class=.*',     # code inline or pre-formatted
+        r'table', r'th', r'tr', r'td',          # tables
+        r'sup', r'sub',                         # up and down text
+    ]) + ')>')
+    TAG = re.compile(r'<[^/ ][^><]*>')
+    PARAGRAPH = re.compile(r'</?p>')
+
+    markdown = mistune.create_markdown(escape=False, plugins=['strikethrough', 'footnotes', 'table'])
 
     @staticmethod
-    def load_ressources() -> dict[str, list[str]]:
-        data = {'css': ['./www/css/bootstrap.min.css', './www/css/syllabus.css', './www/css/katex-fontless.css'],
-                'js': ['./www/js/bootstrap.bundle.min.js', './www/js/katex.min.js', './www/js/auto-render.min.js']}
-        for kind in data:
-            loaded = []
-            for file in data[kind]:
-                with open(file, 'r') as f:
-                    loaded.append(f.read())
-            data[kind] = loaded
-        return data
+    def sanitize(match: re.Match) -> str:
+        tag = match.group(0)
+        if Tools.ALLOWED.search(tag) is not None:
+            return tag
+        return tag.replace('>', '&gt;').replace('<', '&lt;')
+
+    @staticmethod
+    def render(content: str) -> str:
+        Metrics.count('markdown:calls')
+        return Tools.convert(content)
+
+    @staticmethod
+    def document(content: str) -> str:
+        # UE and cycle descriptions: plain markdown, no sanitizing nor line breaks, one render per call
+        Metrics.count('markdown:calls')
+        Metrics.count('markdown:renders')
+        return Tools.markdown(content)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def convert(content: str) -> str:
+        Metrics.count('markdown:renders')
+        data = '\n'.join(f'{Tools.TAG.sub(Tools.sanitize, line)}  ' for line in content.splitlines())
+        data = Tools.markdown(data)
+        return Tools.PARAGRAPH.sub('', data)
+
+
+class InvalidSource(Exception):
+    def __init__(self, filepath: str, errors: list[str]):
+        super().__init__(filepath, errors)
+        self.filepath: str = filepath
+        self.errors: list[str] = errors
+
+    def __str__(self):
+        return f'{self.filepath}: {len(self.errors)} schema error(s)\n' + '\n'.join(f'  - {error}' for error in self.errors)
+
+
+# schemata are loaded, checked and compiled once per process, then shared by every file
+class Schemata:
+    directory: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates/schemata/')
+    registry: Registry | None = None
+    validators: dict[str, Any] = {}
+    digests: dict[str, bytes] = {}
+
+    @staticmethod
+    def retrieve(uri: str) -> Resource:
+        name = uri.removeprefix('file://').removeprefix(Schemata.directory)
+        with open(os.path.join(Schemata.directory, name)) as f:
+            return Resource.from_contents(json.load(f), default_specification=DRAFT7)
+
+    @staticmethod
+    def get(schema: str) -> Any:
+        if schema not in Schemata.validators:
+            if Schemata.registry is None:
+                Schemata.registry = Registry(retrieve=Schemata.retrieve)
+            retrieved = Schemata.registry.get_or_retrieve(schema)
+            Schemata.registry = retrieved.registry
+            contents = retrieved.value.contents
+            cls = jsonschema.validators.validator_for(contents)
+            cls.check_schema(contents)
+            Schemata.validators[schema] = cls(contents, registry=Schemata.registry)
+        return Schemata.validators[schema]
+
+    @staticmethod
+    def digest(schema: str) -> bytes:
+        if schema not in Schemata.digests:
+            with open(os.path.join(Schemata.directory, schema), 'rb') as f:
+                Schemata.digests[schema] = hashlib.sha256(f.read()).digest()
+        return Schemata.digests[schema]
+
+    @staticmethod
+    def validate(data: Any, schema: str, filepath: str) -> None:
+        errors = sorted(Schemata.get(schema).iter_errors(data), key=lambda x: x.json_path)
+        if 0 != len(errors):
+            raise InvalidSource(filepath, [f'{error.json_path}: {error.message}' for error in errors])
+
+
+class Source:
+    PREAMBLE = 'preamble'
+    UE = 'ue'
+    ECUE = 'ecue'
+
+    __slots__ = ['kind', 'filepath', 'year', 'cycle', 'semester', 'ue', 'code']
+
+    def __init__(self, kind: str, filepath: str, year: str, cycle: str, ue: str | None = None, code: str | None = None):
+        self.kind: str = kind
+        self.filepath: str = filepath
+        self.year: str = year
+        self.cycle: str = cycle
+        self.ue: str | None = ue
+        self.semester: str | None = ue.split('-')[2] if ue is not None else None
+        self.code: str = code if code is not None else (ue if ue is not None else year)
+
+    @property
+    def schema(self) -> str | None:
+        match self.kind:
+            case Source.ECUE: return 'ecue.json'
+            case Source.UE: return 'ue.json'
+        return None
+
+    def __repr__(self):
+        return f'Source({self.kind}, {self.filepath})'
+
+
+# single pass discovery of the sources, laid out as:
+#   <root>/<year>/<cycle>/.preamble.yml
+#   <root>/<year>/<cycle>/<ue>/.ue.yml
+#   <root>/<year>/<cycle>/<ue>/<ecue>.yml
+# symbolic links are followed (UE shared between cycles), loops are skipped
+class Manifest:
+    __slots__ = ['root', 'sources']
+
+    def __init__(self, root: str):
+        self.root: str = root
+        self.sources: list[Source] = []
+
+    @staticmethod
+    def scan(root: str = 'src') -> Manifest:
+        result = Manifest(root)
+        st = os.stat(root)
+        result.walk(root, [], {(st.st_dev, st.st_ino)})
+        result.sources.sort(key=lambda x: x.filepath)
+        return result
+
+    def walk(self, path: str, parts: list[str], ancestors: set[tuple[int, int]]) -> None:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda x: x.name)
+        for entry in entries:
+            if entry.is_dir():
+                st = entry.stat()
+                key = (st.st_dev, st.st_ino)
+                if key in ancestors:
+                    print(f'skipping symlink loop: {entry.path}')
+                    continue
+                self.walk(entry.path, parts + [entry.name], ancestors | {key})
+            elif entry.name.endswith('.yml') and entry.is_file():
+                self.classify(entry.path, parts, entry.name)
+
+    def classify(self, filepath: str, parts: list[str], name: str) -> None:
+        match len(parts), name:
+            case 2, '.preamble.yml':
+                self.sources.append(Source(Source.PREAMBLE, filepath, year=parts[0], cycle=parts[1]))
+            case 3, '.ue.yml':
+                self.sources.append(Source(Source.UE, filepath, year=parts[0], cycle=parts[1], ue=parts[2]))
+            case 3, _ if not name.startswith('.'):
+                self.sources.append(Source(Source.ECUE, filepath, year=parts[0], cycle=parts[1], ue=parts[2], code=name.split('.')[0]))
+
+    def select(self, kind: str) -> list[Source]:
+        return [source for source in self.sources if source.kind == kind]
+
+    def cycles(self) -> dict[tuple[str, str], list[Source]]:
+        result = {}
+        for source in self.sources:
+            result.setdefault((source.year, source.cycle), []).append(source)
+        return result
+
+
+# parse and validate the sources, optionally on a process pool: workers only
+# return plain data, model objects are built back in the main process
+class Loader:
+    __slots__ = ['jobs', 'cache']
+
+    def __init__(self, jobs: int = 1, cache: DiskCache | None = None):
+        self.jobs: int = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.cache: DiskCache | None = cache
+
+    @staticmethod
+    def parse(source: Source, cache: DiskCache | None = None) -> tuple[Any, bool]:
+        with open(source.filepath, 'rb') as f:
+            content = f.read()
+        if cache is not None:
+            key = cache.key(Schemata.digest(source.schema) if source.schema is not None else bytes(32), content)
+            found, data = cache.get(key)
+            if found:
+                return data, True
+        data = Tools.parse_yaml(content)
+        if source.schema is not None:
+            Schemata.validate(data, source.schema, source.filepath)
+        if cache is not None:
+            cache.put(key, data)
+        return data, False
+
+    @staticmethod
+    def build(source: Source, data: Any) -> ECUE | UE | Preamble:
+        match source.kind:
+            case Source.ECUE: return ECUE.load(source, data)
+            case Source.UE: return UE.load(source, data)
+        return Preamble.load(source, data)
+
+    def load(self, sources: list[Source]) -> list[tuple[Source, Any]]:
+        parse = partial(Loader.parse, cache=self.cache)
+        if self.jobs == 1 or len(sources) < 2:
+            records = [parse(source) for source in sources]
+        else:
+            chunksize = max(1, len(sources) // (self.jobs * 4))
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                records = list(pool.map(parse, sources, chunksize=chunksize))
+        if self.cache is not None:
+            hits = sum(1 for _, hit in records if hit)
+            Metrics.count('parse-cache:hits', hits)
+            Metrics.count('parse-cache:misses', len(records) - hits)
+            print(f'parse cache: {hits}/{len(records)} sources reused')
+            self.cache.evict()
+        return [(source, data) for source, (data, _) in zip(sources, records)]
+
+
+# values are pickled on disk, keyed by the hash of everything they are computed from,
+# least recently used entries are evicted once the cache grows past its limit
+class DiskCache:
+    __slots__ = ['directory', 'namespace', 'limit']
+
+    def __init__(self, directory: str, namespace: str, limit: int = 64 * 1024 * 1024):
+        self.directory: str = directory
+        self.namespace: str = namespace
+        self.limit: int = limit
+
+    def key(self, *parts: bytes | str) -> str:
+        digest = hashlib.sha256(self.namespace.encode('utf-8'))
+        for part in parts:
+            data = part.encode('utf-8') if isinstance(part, str) else part
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pickle')
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        return True, data
+
+    def put(self, key: str, data: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def evict(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.pickle'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            os.remove(path)
+            total -= size
+
+
+# records, for every generated page, the files it is rendered from and their combined digest,
+# pages whose digest did not change since the previous build are not rendered again
+class BuildGraph:
+    SHARED = ['syllabus.py', 'templates/mapping.yml', 'templates/schemata', 'www']
+
+    __slots__ = ['filepath', 'pages', 'compressed']
+
+    def __init__(self, filepath: str = '.cache/build-graph.json'):
+        self.filepath: str = filepath
+        self.pages: dict[str, dict[str, Any]] = {}
+        self.compressed: dict[str, str] = {}
 
     @staticmethod
-    def separate():
-        return dt.br(), dt.hr(), dt.br()
+    def load(filepath: str = '.cache/build-graph.json') -> BuildGraph:
+        result = BuildGraph(filepath)
+        try:
+            with open(filepath) as f:
+                data = json.load(f)
+            result.pages = data['pages']
+            result.compressed = data.get('compressed', {})
+        except (OSError, ValueError, KeyError):
+            pass
+        return result
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.filepath, 'w') as f:
+            json.dump({'pages': self.pages, 'compressed': self.compressed}, f, indent=1, sort_keys=True)
+
+    @staticmethod
+    def shared() -> list[str]:
+        result = []
+        for path in BuildGraph.SHARED:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    result.extend(os.path.join(root, file) for file in files)
+            else:
+                result.append(path)
+        return sorted(result)
+
+    def digest(self, dependencies: list[str], options: str = '') -> str:
+        digest = hashlib.sha256(f'{options}\n'.encode('utf-8'))
+        for filepath in dependencies:
+            digest.update(f'{filepath}\0{Tools.digest(filepath)}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def dirty(self, output: str, digest: str) -> bool:
+        return not os.path.exists(output) or self.pages.get(output, {}).get('digest') != digest
+
+    def update(self, output: str, digest: str, dependencies: list[str]) -> None:
+        self.pages[output] = {'digest': digest, 'dependencies': dependencies}
+
+    def retain(self, outputs: list[str]) -> None:
+        self.pages = {output: self.pages[output] for output in outputs if output in self.pages}
+        # bundles are only known when a page is rendered, they are kept as long as they exist
+        self.compressed = {filepath: digest for filepath, digest in self.compressed.items() if filepath in outputs or os.path.exists(filepath)}
+
+
+# version printed in the page header, derived from the inputs only so that rebuilding the same
+# sources gives the same bytes: SOURCE_DATE_EPOCH when set, otherwise the date of the last commit
+# touching the page inputs, otherwise (no git, uncommitted changes) the digest of the inputs
+class Version:
+    FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    @staticmethod
+    def git(*arguments: str) -> str | None:
+        try:
+            result = subprocess.run(['git', *arguments], capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout
+
+    @staticmethod
+    def stamp(dependencies: list[str], digest: str) -> str:
+        epoch = os.environ.get('SOURCE_DATE_EPOCH')
+        if epoch is None:
+            # symbolic links are resolved, git refuses paths that go through them
+            paths = sorted({os.path.realpath(filepath) for filepath in dependencies})
+            if Version.git('status', '--porcelain', '--', *paths) == '':
+                epoch = (Version.git('log', '-1', '--format=%ct', '--', *paths) or '').strip() or None
+        if epoch is None:
+            return digest[:12]
+        return datetime.fromtimestamp(int(epoch), timezone.utc).strftime(Version.FORMAT)
+
+
+class Stream:
+    # file sink for the dominate renderer, which only ever appends to its buffer
+    __slots__ = ['append']
+
+    def __init__(self, f: Any):
+        self.append: Callable[[str], Any] = f.write
+
+
+# a subtree built only when the page is written: it is rendered straight to the output and freed
+class Deferred(dominate.dom_tag.dom_tag):
+    is_inline = False
+
+    def __new__(cls, *args, **kwargs):
+        # dom_tag turns a single callable argument into a decorator
+        return object.__new__(cls)
+
+    def __init__(self, build: Callable[[], dominate.dom_tag.dom_tag]):
+        super().__init__()
+        self.build: Callable[[], dominate.dom_tag.dom_tag] = build
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        return self.build()._render(sb, indent_level, indent_str, pretty, xhtml)
+
+
+# a deferred subtree rendered once and spliced back as text: on a cache hit it is never built
+class Fragment(Deferred):
+    cache: DiskCache | None = None
+
+    def __init__(self, key: str, build: Callable[[], dominate.dom_tag.dom_tag]):
+        super().__init__(build)
+        self.key: str = key
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        cache = Fragment.cache
+        if cache is None:
+            return super()._render(sb, indent_level, indent_str, pretty, xhtml)
+        key = cache.key(self.key, str(indent_level), indent_str, str(pretty), str(xhtml))
+        found, data = cache.get(key)
+        Metrics.count('fragment-cache:hits' if found else 'fragment-cache:misses')
+        if not found:
+            data = ''.join(self.build()._render([], indent_level, indent_str, pretty, xhtml))
+            cache.put(key, data)
+        sb.append(data)
+        return sb
+
+
+# --split mode: a UE or ECUE pane is written to its own file next to the page and left empty in it,
+# the page fetches it and renders its math the first time its tab is opened
+class Lazy(Deferred):
+    KINDS = ['ue', 'ecue']
+    SCRIPT = (
+        'document.addEventListener("show.bs.tab", function(event) {'
+        ' var pane = document.querySelector(event.target.getAttribute("data-bs-target"));'
+        ' var src = pane === null ? null : pane.getAttribute("data-src");'
+        ' if (src === null) { return; }'
+        ' pane.removeAttribute("data-src");'
+        ' fetch(src).then(function(response) { if (!response.ok) { throw new Error(response.statusText); } return response.text(); }).then(function(html) {'
+        ' var template = document.createElement("template");'
+        ' template.innerHTML = html;'
+        ' pane.replaceChildren.apply(pane, Array.from(template.content.firstElementChild.childNodes));'
+        ' renderMathInElement(pane, %s);'
+        ' }).catch(function() { pane.setAttribute("data-src", src); }); });'
+    )
+
+    enabled: bool = False
+    directory: str = ''
+
+    def __init__(self, kind: str, code: str, cls: str, target: str, build: Callable[[], Any]):
+        super().__init__(build)
+        self.attributes: str = Layout.pane(cls, target, data_src=f'{kind}/{code}.html')
+        self.filepath: str = os.path.join(Lazy.directory, kind, f'{code}.html')
+
+    @staticmethod
+    def files(directory: str) -> list[str]:
+        result = []
+        for kind in Lazy.KINDS:
+            if os.path.isdir(os.path.join(directory, kind)):
+                result.extend(sorted(os.path.join(directory, kind, name) for name in os.listdir(os.path.join(directory, kind)) if name.endswith('.html')))
+        return result
 
     @staticmethod
-    def plain(content: str):
-        tags = '<(?:' + '|'.join([
-            r'a', r'a\s+href=.*',                   # html link
-            r'img',                                 # images
-            r'i', r'em',                            # italic, emphasis
-            r'b', r'strong',                        # bold, strong
-            r'p',                                   # paragraph
-            r'u',                                   # underline
-            r'h[1-6]',                              # headers
-            r'ul', r'ol', r'li',                    # list, numbered or not
-            r'br', r'hr',                           # new-line,
-            r'code', r'pre', r'pre\s+class=.*',     # code inline or pre-formatted
-            r'table', r'th', r'tr', r'td',          # tables
-            r'sup', r'sub',                         # up and down text
-        ]) + ')>'
+    def clean(directory: str) -> None:
+        # fragments are rewritten with their page, the ones of removed UE/ECUE must not linger
+        for kind in Lazy.KINDS:
+            shutil.rmtree(os.path.join(directory, kind), ignore_errors=True)
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.filepath, 'w') as f:
+            self.build()._render(Stream(f), 0, indent_str, pretty, xhtml)
+        Metrics.count('bytes:fragments', os.path.getsize(self.filepath))
+        sb.append(f'<div{self.attributes}></div>')
+        return sb
+
+
+# fast emitter for the fixed section skeletons: same output as dominate (pretty printing, inline and
+# void tags), but attributes are rendered once up front and no context manager is involved
+class Element:
+    INLINE = {'i', 'br', 'wbr'}
+    SINGLE = {'area', 'base', 'br', 'col', 'command', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+    UNFORMATTED = {'pre', 'script', 'style'}
+
+    __slots__ = ['tag', 'attributes', 'children']
+
+    def __init__(self, tag: str, attributes: str = '', *children: Element | str):
+        self.tag: str = tag
+        self.attributes: str = attributes
+        self.children: list[Element | str] = list(children)
+
+    def add(self, *children: Element | str) -> Element:
+        self.children.extend(children)
+        return self
 
+    @staticmethod
+    def attrs(**kwargs: Any) -> str:
+        # dominate attribute naming (cls, data_*, aria_*), ordering and escaping
         result = []
-        for line in content.splitlines():
-            for tag in re.findall(r'<[^/ ][^><]*>', line):
-                if 0 == len(re.findall(tags, tag)):
-                    line = re.sub(tag, re.sub('<', '&lt;', re.sub('>', '&gt;', tag)), line)
-            result.append(f'{line}  ')
+        for key, value in kwargs.items():
+            if value is False or value is None:
+                continue
+            key = 'class' if key == 'cls' else key
+            if key.startswith('data_') or key.startswith('aria_'):
+                key = key.replace('_', '-')
+            result.append((key, Element.text(value)))
+        return ''.join(f' {key}="{value}"' for key, value in sorted(result))
 
-        data = '\n'.join(result)
-        data = mistune.html(data)
-        data = re.sub(r'</?p>', '', data)
+    @staticmethod
+    def text(value: Any) -> str:
+        return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
 
-        return dominate.util.raw(data)
+    @staticmethod
+    def separate() -> tuple[Element, Element, Element]:
+        return Element('br'), Element('hr'), Element('br')
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        tag = self.tag
+        sb.append(f'<{tag}{self.attributes}>')
+        if tag in Element.SINGLE:
+            return sb
+        pretty = pretty and tag not in Element.UNFORMATTED
+        inline = True
+        for child in self.children:
+            if type(child) is str:
+                sb.append(child)
+                continue
+            if pretty and child.tag not in Element.INLINE:
+                inline = False
+                sb.append('\n')
+                sb.append(indent_str * (indent_level + 1))
+            child._render(sb, indent_level + 1, indent_str, pretty, xhtml)
+        if pretty and not inline:
+            sb.append('\n')
+            sb.append(indent_str * indent_level)
+        sb.append(f'</{tag}>')
+        return sb
+
+
+class Layout:
+    # attributes shared by the section skeletons
+    ROW = Element.attrs(cls='row')
+    HEADER_COL = Element.attrs(cls='col-12', style='padding: 0')
+    HEADER = Element.attrs(cls='card-header h3')
+    BODY = Element.attrs(cls='row overflow-auto', style='height: 80vh; overflow-y: scroll;')
+    MAIN = Element.attrs(cls='col-8', style='padding: 32px;')
+    SIDE = Element.attrs(cls='col-4', style='padding-right: 32px')
+    STICKY = Element.attrs(cls='sticky-top')
+    TABLE = Element.attrs(cls='table table-bordered')
+    TABLE_MIDDLE = Element.attrs(cls='table table-bordered', style='vertical-align: middle;')
+    TABLE_HEAD = Element.attrs(cls='table-light')
+    TABLE_TITLE = Element.attrs(cls='table-light fw-bold')
+    TITLE_CELL = Element.attrs(colspan='2')
+    LABEL_CELL = Element.attrs(cls='fw-bold')
+    RIGHT_CELL = Element.attrs(style='text-align: right;')
+    CARD_TITLE = Element.attrs(cls='card-title h4')
+    CARD_TEXT = Element.attrs(cls='card-text')
 
+    @staticmethod
+    def pane(cls: str, target: str, **kwargs: Any) -> str:
+        return Element.attrs(cls=cls, id=f'div-{target}', role='tabpanel', aria_labelledby=f'tab-{target}', **kwargs)
 
-class Stats:
-    __slots__ = ['lecture', 'remediation', 'tutorial', 'practical', 'personnal', 'exam', '__current', '__list']
+    @staticmethod
+    def info(label: str, value: Any) -> Element:
+        return Element('tr', '', Element('td', Layout.LABEL_CELL, Element.text(label)), Element('td', '', Element('code', '', Element.text(value))))
+
+    @staticmethod
+    def hours(stats: Stats, highlight: bool = False) -> Element:
+        title = Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('info-hours'))))
+        for cat in stats:
+            if stats[cat] > 0:
+                attributes = Element.attrs(cls=('table-light' if cat in ['total', 'supervised'] else '') + (' fw-bold' if cat in ['total'] else '')) if highlight else ''
+                title.add(Element('tr', attributes,
+                                  Element('td', '', Tools.render(Tools.tr(cat))),
+                                  Element('td', Layout.RIGHT_CELL, Element('code', '', Element.text(Stats.format(stats[cat]))))))
+        return Element('table', Layout.TABLE, Element('tbody', '', title))
+
+
+# renders the pages, optionally on a process pool: pages are independent, each worker returns
+# its log so the output stays in page order whatever the scheduling
+class Renderer:
+    __slots__ = ['jobs']
+
+    def __init__(self, jobs: int = 1):
+        self.jobs: int = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    @staticmethod
+    def render(page: tuple[str, Cycle, str], mapping: dict[str, str], cache: DiskCache | None, assets: str, split: bool, verbose: bool) -> tuple[str, str, dict[str, Any]]:
+        year, cycle, version = page
+        Tools.mapping = mapping
+        Tools.verbose = verbose
+        Fragment.cache = cache
+        Assets.mode = assets
+        Lazy.enabled = split
+        start = time.perf_counter()
+        log = io.StringIO()
+        output = Cycle.output(year, cycle.code)
+        with Metrics.capture() as metrics, contextlib.redirect_stdout(log):
+            with Metrics.timer(f'display:{year}/{cycle.code.lower()}'):
+                cycle.display(year, version)
+            Metrics.count('bytes:pages', os.path.getsize(output))
+        return log.getvalue(), f'generated {output} ({os.path.getsize(output)} bytes in {time.perf_counter() - start:.2f} s)', metrics
+
+    def run(self, pages: list[tuple[str, Cycle, str]]) -> None:
+        # loaded before forking so that workers inherit them
+        Assets.load()
+        render = partial(Renderer.render, mapping=Tools.mapping, cache=Fragment.cache, assets=Assets.mode, split=Lazy.enabled, verbose=Tools.verbose)
+        if self.jobs == 1 or len(pages) < 2:
+            results = map(render, pages)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(pages))) as pool:
+                results = list(pool.map(render, pages))
+        for log, summary, metrics in results:
+            print(log, end='')
+            print(summary)
+            Metrics.merge(metrics)
+
+
+# writes the .gz (and .br when brotli is available) siblings served by GitLab Pages, at maximum
+# compression; files whose content digest did not change since the previous build are skipped
+class Compressor:
+    __slots__ = ['jobs']
+
+    def __init__(self, jobs: int = 1):
+        self.jobs: int = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    @staticmethod
+    def siblings(filepath: str) -> list[str]:
+        return [f'{filepath}.gz'] + ([f'{filepath}.br'] if brotli is not None else [])
+
+    @staticmethod
+    def write(filepath: str, data: bytes) -> int:
+        tmp = f'{filepath}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, filepath)
+        return len(data)
+
+    @staticmethod
+    def compress(filepath: str) -> tuple[str, int]:
+        start = time.perf_counter()
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        # no timestamp in the gzip header: same page, same bytes
+        sizes = [Compressor.write(f'{filepath}.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            sizes.append(Compressor.write(f'{filepath}.br', brotli.compress(data, quality=11)))
+        return f'compressed {filepath} ({len(data)} -> {" / ".join(str(size) for size in sizes)} bytes in {time.perf_counter() - start:.2f} s)', sum(sizes)
+
+    def run(self, files: list[str], graph: BuildGraph) -> None:
+        pending = {}
+        for filepath in files:
+            if not os.path.exists(filepath):
+                continue
+            with open(filepath, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if graph.compressed.get(filepath) == digest and all(os.path.exists(sibling) for sibling in Compressor.siblings(filepath)):
+                Tools.log(f'skipping unchanged compression: {filepath}')
+                Metrics.count('compress:skipped')
+            else:
+                pending[filepath] = digest
+        if self.jobs == 1 or len(pending) < 2:
+            results = map(Compressor.compress, pending)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(pending))) as pool:
+                results = list(pool.map(Compressor.compress, pending))
+        for summary, written in results:
+            Tools.log(summary)
+            Metrics.count('bytes:compressed', written)
+        graph.compressed.update(pending)
+
+    @staticmethod
+    def discard(files: list[str], graph: BuildGraph) -> None:
+        # no compression in this build: the siblings of a file rewritten since it was last compressed
+        # would be served in its place, they are removed
+        for filepath in files:
+            siblings = [sibling for sibling in (f'{filepath}.gz', f'{filepath}.br') if os.path.exists(sibling)]
+            if os.path.exists(filepath) and siblings:
+                with open(filepath, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                if graph.compressed.get(filepath) == digest:
+                    continue
+            for sibling in siblings:
+                os.remove(sibling)
+                Tools.log(f'removed stale {sibling}')
+            graph.compressed.pop(filepath, None)
+
+
+# compact JSON export of a cycle for the app, next to its page, and a manifest of the content
+# hashes of every export so that clients only download the cycles that changed
+# the delta feed compares each rebuilt cycle with the field hashes of its UE and ECUE records kept
+# in .cache/ by the previous build (public/ is not kept between CI builds, its previous export is
+# only a fallback): records are matched by code, only the changed fields are listed
+class Export:
+    SCHEMA = 1
+    MANIFEST = 'public/fr/syllabus.json'
+    CHANGES = 'public/fr/changes.json'
+    STATE = '.cache/changes.json'
+
+    @staticmethod
+    def output(year: str, code: str) -> str:
+        return f'public/fr/{year}/{code.lower()}/syllabus.json'
+
+    @staticmethod
+    def stats(stats: Stats) -> dict[str, float]:
+        return {key: stats[key] for key in stats}
+
+    @staticmethod
+    def ecue(ecue: ECUE) -> dict[str, Any]:
+        return {
+            'code': ecue.code,
+            'label': ecue.label,
+            'coefficient': ecue.coefficient,
+            'threshold': ecue.threshold,
+            'referents': ecue.referents,
+            'evaluations': [{
+                'code': evaluation.code,
+                'label': evaluation.label,
+                'kind': evaluation.kind,
+                'environment': evaluation.environment,
+                'coefficient': evaluation.coefficient,
+                'hours': evaluation.hours
+            } for evaluation in ecue.evaluations],
+            'stats': Export.stats(ecue.stats)
+        }
+
+    @staticmethod
+    def ue(ue: UE) -> dict[str, Any]:
+        return {
+            'code': ue.code,
+            'label': ue.label,
+            'level': ue.level,
+            'ects': ue.ects,
+            'coordinator': ue.coordinator,
+            'stats': Export.stats(ue.stats),
+            'ecues': [Export.ecue(ecue) for ecue in ue.flatten()]
+        }
+
+    @staticmethod
+    def cycle(year: str, cycle: Cycle, version: str) -> dict[str, Any]:
+        return {
+            'schema': Export.SCHEMA,
+            'year': year,
+            'cycle': cycle.code,
+            'version': version,
+            'stats': Export.stats(cycle.stats),
+            'semesters': [{
+                'code': cycle.semesters[semester].code,
+                'stats': Export.stats(cycle.semesters[semester].stats),
+                'ues': [Export.ue(cycle.semesters[semester].ues[ue]) for ue in sorted(cycle.semesters[semester].ues)]
+            } for semester in sorted(cycle.semesters)]
+        }
+
+    @staticmethod
+    def read(filepath: str) -> dict[str, Any] | None:
+        try:
+            with open(filepath) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get('schema') == Export.SCHEMA else None
+
+    @staticmethod
+    def index(data: dict[str, Any] | None) -> dict[str, dict[str, dict[str, Any]]]:
+        result = {'ue': {}, 'ecue': {}}
+        for semester in (data or {}).get('semesters', []):
+            for ue in semester['ues']:
+                result['ue'][ue['code']] = {'semester': semester['code']} | {key: value for key, value in ue.items() if key != 'ecues'}
+                for ecue in ue['ecues']:
+                    result['ecue'][ecue['code']] = {'ue': ue['code']} | ecue
+        return result
+
+    @staticmethod
+    def hash(value: Any) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def fingerprint(data: dict[str, Any] | None) -> dict[str, Any] | None:
+        # version of an export and the hash of every field of its UE and ECUE records
+        if data is None:
+            return None
+        return {'version': data['version']} | {kind: {code: {key: Export.hash(value) for key, value in record.items()} for code, record in records.items()}
+                                               for kind, records in Export.index(data).items()}
+
+    @staticmethod
+    def state() -> dict[str, Any]:
+        # field hashes of the records of every cycle and the last published delta
+        result = {'schema': Export.SCHEMA, 'cycles': {}, 'changes': {'schema': Export.SCHEMA, 'cycles': {}}}
+        try:
+            with open(Export.STATE) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return result
+        return result | data if data.get('schema') == Export.SCHEMA else result
+
+    @staticmethod
+    def changes(previous: dict[str, Any] | None, current: dict[str, Any]) -> dict[str, Any] | None:
+        before = previous or {'ue': {}, 'ecue': {}}
+        after = Export.index(current)
+        result = {}
+        for kind in after:
+            added = {code: record for code, record in after[kind].items() if code not in before[kind]}
+            removed = sorted(code for code in before[kind] if code not in after[kind])
+            modified = {}
+            for code, record in after[kind].items():
+                if code not in before[kind]:
+                    continue
+                fields = {key: value for key, value in record.items() if before[kind][code].get(key) != Export.hash(value)}
+                fields |= {key: None for key in before[kind][code] if key not in record}
+                if fields:
+                    modified[code] = fields
+            if added or removed or modified:
+                result[kind] = {'added': added, 'removed': removed, 'modified': modified}
+        if not result:
+            return None
+        return {'from': previous['version'] if previous is not None else None, 'to': current['version']} | result
+
+    @staticmethod
+    def write(filepath: str, data: Any) -> None:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        Metrics.count('bytes:exports', Compressor.write(filepath, json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')))
+        Tools.log(f'exported {filepath}')
+
+    @staticmethod
+    def manifest(exports: dict[tuple[str, str], str]) -> None:
+        # every export on disk, including the ones of pages skipped by this build
+        files = {}
+        for (year, cycle), filepath in sorted(exports.items()):
+            if not os.path.exists(filepath):
+                continue
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            files[os.path.relpath(filepath, os.path.dirname(Export.MANIFEST)).replace(os.sep, '/')] = {
+                'year': year,
+                'cycle': cycle,
+                'sha256': hashlib.sha256(data).hexdigest(),
+                'size': len(data)
+            }
+        Export.write(Export.MANIFEST, {'schema': Export.SCHEMA, 'files': files})
+
+
+# cross-year and cross-cycle comparison: each cycle is reduced once to a snapshot of its exported
+# model (ECUE records by code, hours rows), every pair of snapshots is then compared from memory
+class Snapshot:
+    __slots__ = ['year', 'cycle', 'version', 'ecues', 'stats', 'semesters']
+
+    def __init__(self, year: str, data: dict[str, Any]):
+        self.year: str = year
+        self.cycle: str = data['cycle']
+        self.version: str = data['version']
+        self.ecues: dict[str, dict[str, Any]] = Export.index(data)['ecue']
+        # UE codes start with the year and cycle, which differ by construction
+        for record in self.ecues.values():
+            record['ue'] = record['ue'].removeprefix(f'{year}-{self.cycle}-')
+        self.stats: Stats = Snapshot.hours(data['stats'])
+        self.semesters: dict[str, Stats] = {semester['code']: Snapshot.hours(semester['stats']) for semester in data['semesters']}
+
+    @property
+    def name(self) -> str:
+        return f'{self.year}/{self.cycle}'
+
+    @staticmethod
+    def hours(stats: dict[str, float]) -> Stats:
+        return Stats([stats[category] for category in Stats.CATEGORIES])
+
+
+class Comparison:
+    OUTPUT = 'public/fr/compare/index.html'
+    DATA = 'public/fr/compare.json'
+    # compared ECUE fields and their mapping key, the hours are compared as Stats
+    FIELDS = {'label': 'compare-label', 'ue': 'ue', 'coefficient': 'info-coefficient', 'threshold': 'info-threshold', 'referents': 'referent', 'evaluations': 'evaluations'}
+
+    __slots__ = ['before', 'after', 'added', 'removed', 'fields', 'hours', 'totals']
+
+    def __init__(self, before: Snapshot, after: Snapshot):
+        self.before: Snapshot = before
+        self.after: Snapshot = after
+        self.added: list[str] = sorted(code for code in after.ecues if code not in before.ecues)
+        self.removed: list[str] = sorted(code for code in before.ecues if code not in after.ecues)
+        matched = sorted(code for code in after.ecues if code in before.ecues)
+
+        self.fields: dict[str, dict[str, tuple[Any, Any]]] = {}
+        for code in matched:
+            fields = {field: (before.ecues[code].get(field), after.ecues[code].get(field)) for field in Comparison.FIELDS}
+            fields = {field: values for field, values in fields.items() if values[0] != values[1]}
+            if fields:
+                self.fields[code] = fields
+
+        # one subtraction for the matched ECUE, one for the cycle and its semesters
+        self.hours: dict[str, Stats] = {}
+        for code, stats in zip(matched, Stats.delta([Snapshot.hours(before.ecues[code]['stats']) for code in matched], [Snapshot.hours(after.ecues[code]['stats']) for code in matched])):
+            if any(stats.values):
+                self.hours[code] = stats
+        semesters = sorted(set(before.semesters) | set(after.semesters))
+        totals = Stats.delta([before.stats] + [before.semesters.get(semester, Stats()) for semester in semesters],
+                             [after.stats] + [after.semesters.get(semester, Stats()) for semester in semesters])
+        self.totals: dict[str, Stats] = dict(zip(['total'] + semesters, totals))
+
+    @staticmethod
+    def run(snapshots: list[Snapshot]) -> list[Comparison]:
+        return [Comparison(before, after) for before, after in combinations(sorted(snapshots, key=lambda snapshot: (snapshot.year, snapshot.cycle)), 2)]
+
+    @property
+    def modified(self) -> list[str]:
+        return sorted(set(self.fields) | set(self.hours))
+
+    @property
+    def target(self) -> str:
+        return f'{self.before.year}-{self.before.cycle}-{self.after.year}-{self.after.cycle}'
+
+    @staticmethod
+    def hours_delta(stats: Stats) -> dict[str, float]:
+        return {key: round(stats[key], 6) for key in stats if round(stats[key], 6) != 0}
+
+    def export(self) -> dict[str, Any]:
+        return {
+            'from': {'name': self.before.name, 'version': self.before.version},
+            'to': {'name': self.after.name, 'version': self.after.version},
+            'hours': {name: Comparison.hours_delta(stats) for name, stats in self.totals.items()},
+            'added': self.added,
+            'removed': self.removed,
+            'modified': {code: {
+                'fields': {field: list(values) for field, values in self.fields.get(code, {}).items()},
+                'hours': Comparison.hours_delta(self.hours.get(code, Stats()))
+            } for code in self.modified}
+        }
+
+    @staticmethod
+    def format(hours: float) -> str:
+        if round(hours, 6) == 0:
+            return ''
+        return ('+' if hours > 0 else '-') + Stats.format(abs(hours))
+
+    @staticmethod
+    def value(field: str, value: Any) -> str:
+        match field:
+            case 'referents': return ', '.join(value or [])
+            case 'evaluations': return ', '.join(f'{evaluation["code"]} ({evaluation["kind"]}, {evaluation["coefficient"]})' for evaluation in value or [])
+        return '' if value is None else str(value)
+
+    def label(self, code: str) -> str:
+        return (self.after.ecues.get(code) or self.before.ecues[code])['label']
+
+    def codes(self, title: str, codes: list[str]) -> Element:
+        items = Element('ul', '')
+        for code in codes:
+            items.add(Element('li', '', Element.text(self.label(code)), ' ', Element('code', '', Element.text(f'[{code}]'))))
+        return Element('div', '', Element('h5', '', Element.text(f'{Tools.tr(title)} ({len(codes)})')), items)
+
+    def render(self, active: bool) -> Element:
+        columns = list(self.totals)
+        hours = Element('tbody', '')
+        for key in Stats.KEYS:
+            hours.add(Element('tr', '', Element('td', Layout.LABEL_CELL, Tools.render(Tools.tr(key))),
+                              *[Element('td', Layout.RIGHT_CELL, Element('code', '', Element.text(Comparison.format(self.totals[column][key])))) for column in columns]))
+        head = Element('tr', Layout.TABLE_TITLE, Element('td', ''), *[Element('td', Layout.RIGHT_CELL, Tools.render(Tools.tr('total' if column == 'total' else column))) for column in columns])
+
+        modified = Element('tbody', '')
+        for code in self.modified:
+            rows = [(Tools.tr(Comparison.FIELDS[field]), Element.text(Comparison.value(field, values[0])), Element.text(Comparison.value(field, values[1]))) for field, values in self.fields.get(code, {}).items()]
+            if code in self.hours:
+                delta = self.hours[code]
+                rows.append((Tools.tr('compare-hours'), '', Element('div', '', *[Element('div', '', Tools.render(Tools.tr(key)), ' ', Element('code', '', Element.text(Comparison.format(delta[key]))))
+                                                                               for key in delta if Comparison.format(delta[key])])))
+            for idx, (field, before, after) in enumerate(rows):
+                cells = [Element('td', Element.attrs(rowspan=str(len(rows)) if len(rows) > 1 else None), Element.text(self.label(code)), ' ', Element('code', '', Element.text(f'[{code}]')))] if 0 == idx else []
+                modified.add(Element('tr', '', *cells, Element('td', Layout.LABEL_CELL, Element.text(field)), Element('td', '', before), Element('td', '', after)))
+
+        return Element('div', Layout.pane('tab-pane fade' + (' show active' if active else ''), self.target),
+                       Element('h4', '', Element.text(f'{Tools.tr(self.before.cycle)} {self.before.year} '), Element('code', '', Element.text(f'(v{self.before.version})')),
+                               ' → ', Element.text(f'{Tools.tr(self.after.cycle)} {self.after.year} '), Element('code', '', Element.text(f'(v{self.after.version})'))),
+                       Element('h5', '', Element.text(Tools.tr('compare-hours'))),
+                       Element('table', Layout.TABLE, Element('thead', '', head), hours),
+                       self.codes('compare-added', self.added),
+                       self.codes('compare-removed', self.removed),
+                       Element('h5', '', Element.text(f'{Tools.tr("compare-modified")} ({len(self.modified)})')),
+                       Element('table', Layout.TABLE_MIDDLE,
+                               Element('thead', '', Element('tr', Layout.TABLE_TITLE, Element('td', '', Element.text(Tools.tr('ecue'))), Element('td', '', Element.text(Tools.tr('compare-field'))),
+                                                            Element('td', '', Element.text(Tools.tr('compare-before'))), Element('td', '', Element.text(Tools.tr('compare-after'))))),
+                               modified))
+
+    @staticmethod
+    def display(comparisons: list[Comparison]) -> None:
+        title = f'{Tools.tr("title")} - {Tools.tr("compare-title")}'
+        Assets.load()
+        result = dominate.document(title=title)
+        result['lang'] = Tools.tr('lang')
+        with result.head:
+            dt.meta(http_equiv='Content-Type', content='text/html; charset=utf-8')
+            dt.meta(name='language', content=Tools.tr('lang'))
+            dt.meta(name='title', content=title)
+            if Assets.mode == Assets.EXTERNAL:
+                dt.link(rel='stylesheet', href=Assets.link('css', Comparison.OUTPUT))
+                dt.script(src=Assets.link('js', Comparison.OUTPUT))
+            else:
+                for css in Assets.css:
+                    dt.style(du.raw(css))
+                for js in Assets.js:
+                    dt.script(du.raw(js))
+
+        result.body['class'] = 'bg-light'
+        with result.body:
+            with dt.div(cls='container'):
+                dt.h2(title, style='color: #102b65; padding: 16px 0')
+                with dt.div(cls='row'):
+                    with dt.div(cls='col-3'):
+                        with dt.div(cls='nav flex-column nav-pills', role='tablist'):
+                            for idx, comparison in enumerate(comparisons):
+                                dt.button(f'{comparison.before.name} → {comparison.after.name}', cls='nav-link text-start' + (' active' if 0 == idx else ''), id=f'tab-{comparison.target}',
+                                          data_bs_toggle='tab', data_bs_target=f'#div-{comparison.target}', aria_controls=f'div-{comparison.target}', aria_selected='true' if 0 == idx else 'false', role='tab', type='button')
+                    with dt.div(cls='col-9'):
+                        with dt.div(cls='tab-content'):
+                            for idx, comparison in enumerate(comparisons):
+                                Deferred(partial(comparison.render, 0 == idx))
+
+        os.makedirs(os.path.dirname(Comparison.OUTPUT), exist_ok=True)
+        with open(Comparison.OUTPUT, 'w', buffering=1024 * 1024) as f:
+            result._render(Stream(f), 0, '  ', True, False)
+        Tools.log(f'generated {Comparison.OUTPUT}')
+
+
+# one generation of the site: the pages whose inputs changed are rendered from the model, then
+# exported and compressed; the loaded sources are kept so that --watch only reloads what changed
+class Build:
+    __slots__ = ['args', 'graph', 'loader', 'objects', 'cycles', 'failed']
+
+    def __init__(self, args: argparse.Namespace):
+        self.args: argparse.Namespace = args
+        self.graph: BuildGraph = BuildGraph() if args.force else BuildGraph.load()
+        self.loader: Loader = Loader(jobs=args.jobs, cache=None if args.no_cache else DiskCache('.cache/syllabus', 'syllabus-parse-1'))
+        self.objects: dict[str, ECUE | UE | Preamble] = {}
+        self.cycles: dict[tuple[str, str], Cycle] = {}
+        # sources whose last version did not load (--watch), the model still holds the previous one
+        self.failed: set[str] = set()
+
+    def plan(self, manifest: Manifest) -> dict[tuple[str, str], tuple[str, list[str], str]]:
+        options = f'assets={self.args.assets}\nsplit={self.args.split}'
+        pages = {}
+        with Metrics.timer('phase:plan'):
+            shared = BuildGraph.shared()
+            for (year, cycle), cycle_sources in manifest.cycles().items():
+                output = Cycle.output(year, cycle)
+                dependencies = [source.filepath for source in cycle_sources] + shared
+                digest = self.graph.digest(dependencies, options)
+                version = Version.stamp(dependencies, digest)
+                # the stamp is part of the page, a new one alone is a reason to render it again
+                digest = self.graph.digest(dependencies, f'{options}\nversion={version}')
+                if self.graph.dirty(output, digest) or not os.path.exists(Export.output(year, cycle)):
+                    pages[(year, cycle)] = (digest, dependencies, version)
+                else:
+                    print(f'skipping unchanged page: {output}')
+        return pages
+
+    def load(self, sources: list[Source]) -> None:
+        with Metrics.timer('phase:load'):
+            for source, data in self.loader.load(sources):
+                self.objects[source.filepath] = Loader.build(source, data)
+
+    def assemble(self, manifest: Manifest, keys: Any) -> list[tuple[str, Cycle]]:
+        syllabus = {}
+        result = []
+        with Metrics.timer('phase:assemble'):
+            for source in manifest.sources:
+                if (source.year, source.cycle) in keys and source.filepath in self.objects:
+                    Tools.store(syllabus, self.objects[source.filepath], source)
+            for year in sorted(syllabus):
+                for cycle in sorted(syllabus[year]):
+                    missing = Build.missing(syllabus[year][cycle])
+                    if missing:
+                        # a source that is absent or failed to load: the page is left as it is until it loads
+                        print(f'skipping incomplete cycle {year}/{cycle}: no valid {", ".join(missing)}')
+                        continue
+                    self.cycles[(year, cycle)] = Cycle.assemble(cycle, syllabus[year][cycle]).summarize()
+                    result.append((year, self.cycles[(year, cycle)]))
+        return result
+
+    @staticmethod
+    def missing(tree: dict[str, Any]) -> list[str]:
+        result = [] if 'preamble' in tree else ['.preamble.yml']
+        for semester in sorted(tree):
+            if type(tree[semester]) == dict:
+                result.extend(os.path.join(ue, '.ue.yml') for ue in sorted(tree[semester]) if 'preamble' not in tree[semester][ue])
+        return result
+
+    def publish(self, manifest: Manifest, pages: dict[tuple[str, str], tuple[str, list[str], str]], compress: bool = True) -> None:
+        cycles = self.assemble(manifest, pages)
+        with Metrics.timer('phase:render'):
+            Renderer(jobs=self.args.jobs).run([(year, cycle, pages[(year, cycle.code)][2]) for year, cycle in cycles])
+        Metrics.count('pages', len(cycles))
+
+        outputs = [Cycle.output(year, cycle) for year, cycle in manifest.cycles()]
+        exports = {(year, cycle): Export.output(year, cycle) for year, cycle in manifest.cycles()}
+        stale = {(source.year, source.cycle) for source in manifest.sources if source.filepath in self.failed}
+        with Metrics.timer('phase:export'):
+            state = Export.state()
+            fingerprints = state['cycles']
+            changes = {}
+            current = {}
+            for year, cycle in cycles:
+                digest, dependencies, version = pages[(year, cycle.code)]
+                name = f'{year}/{cycle.code.lower()}'
+                export = current[(year, cycle.code)] = Export.cycle(year, cycle, version)
+                delta = Export.changes(fingerprints.get(name) or Export.fingerprint(Export.read(Export.output(year, cycle.code))), export)
+                if delta is not None:
+                    changes[name] = delta
+                fingerprints[name] = Export.fingerprint(export)
+                Export.write(Export.output(year, cycle.code), export)
+                if (year, cycle.code) in stale:
+                    # not rendered from the sources on disk: the page stays dirty until they load
+                    print(f'{Cycle.output(year, cycle.code)} rendered from the last valid version of its sources')
+                else:
+                    self.graph.update(Cycle.output(year, cycle.code), digest, dependencies)
+            Export.manifest(exports)
+            # the last delta stays published until a build changes a record, public/ may start empty
+            if changes:
+                state['changes'] = {'schema': Export.SCHEMA, 'cycles': changes}
+            Export.write(Export.CHANGES, state['changes'])
+            names = {f'{year}/{cycle.lower()}' for year, cycle in exports}
+            state['cycles'] = {name: value for name, value in fingerprints.items() if name in names}
+            os.makedirs(os.path.dirname(Export.STATE), exist_ok=True)
+            with open(Export.STATE, 'w') as f:
+                json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        if cycles or not os.path.exists(Comparison.OUTPUT):
+            with Metrics.timer('phase:compare'):
+                # the skipped pages are compared from their export, never from their sources
+                snapshots = [Snapshot(year, data) for (year, cycle), filepath in sorted(exports.items())
+                             if (data := current.get((year, cycle)) or Export.read(filepath)) is not None]
+                comparisons = Comparison.run(snapshots)
+                Export.write(Comparison.DATA, {'schema': Export.SCHEMA, 'comparisons': [comparison.export() for comparison in comparisons]})
+                Comparison.display(comparisons)
+            Metrics.count('comparisons', len(comparisons))
+        panes = [filepath for output in outputs for filepath in Lazy.files(os.path.dirname(output))]
+        files = outputs + panes + list(exports.values()) + [Comparison.OUTPUT, Comparison.DATA]
+        if compress and not self.args.no_compress:
+            with Metrics.timer('phase:compress'):
+                Compressor(jobs=self.args.jobs).run(files + sorted(Assets.bundles.values()), self.graph)
+        else:
+            Compressor.discard(files, self.graph)
+        self.graph.retain(outputs)
+        self.graph.save()
+        if Fragment.cache is not None:
+            Fragment.cache.evict()
+
+
+# --watch: the sources and shared inputs are polled (stat first, content digest once it moved), the
+# changed sources are reloaded into the model kept by the build and the affected pages published again
+class Watcher:
+    __slots__ = ['build', 'interval', 'stamps']
+
+    def __init__(self, build: Build, interval: float = 0.25):
+        self.build: Build = build
+        self.interval: float = interval
+        self.stamps: dict[str, tuple[int, int]] = {}
+
+    @staticmethod
+    def files(manifest: Manifest) -> list[str]:
+        return [source.filepath for source in manifest.sources] + BuildGraph.shared()
+
+    @staticmethod
+    def code(filepath: str) -> bool:
+        # inputs loaded once by this process: the generator itself and the schemata
+        return filepath == 'syllabus.py' or filepath.startswith(os.path.join('templates', 'schemata') + os.sep)
+
+    @staticmethod
+    def stat(filepath: str) -> tuple[int, int]:
+        result = os.stat(filepath)
+        return result.st_mtime_ns, result.st_size
+
+    def snapshot(self, files: list[str]) -> dict[str, tuple[int, int]]:
+        result = {}
+        for filepath in files:
+            try:
+                result[filepath] = Watcher.stat(filepath)
+            except OSError:
+                pass
+        return result
+
+    def poll(self) -> bool:
+        manifest = Manifest.scan('src')
+        stamps = self.snapshot(Watcher.files(manifest))
+        moved = [filepath for filepath in stamps if self.stamps.get(filepath) != stamps[filepath]]
+        removed = [filepath for filepath in self.stamps if filepath not in stamps]
+        self.stamps = stamps
+        if not moved and not removed:
+            return False
+
+        start = time.perf_counter()
+        Metrics.reset()
+        changed = []
+        for filepath in moved:
+            # touched but identical files are not reloaded
+            previous = Tools.digests.pop(filepath, None)
+            if Tools.digest(filepath) != previous:
+                changed.append(filepath)
+        code = [filepath for filepath in changed + removed if Watcher.code(filepath)]
+        if code:
+            # pages rendered by the loaded code would be recorded in the caches under the new digests
+            raise SystemExit(f'{", ".join(code)} changed: nothing published, restart --watch to apply it')
+        for filepath in removed:
+            Tools.digests.pop(filepath, None)
+            self.build.objects.pop(filepath, None)
+            self.build.failed.discard(filepath)
+        if not changed and not removed:
+            return False
+
+        for filepath in changed:
+            print(f'changed: {filepath}')
+            if filepath == 'templates/mapping.yml':
+                Tools.load_mapping(filepath)
+            elif filepath.startswith('www' + os.sep):
+                Assets.loaded = False
+        sources = {source.filepath: source for source in manifest.sources}
+        for filepath in changed:
+            if filepath in sources:
+                try:
+                    self.build.load([sources[filepath]])
+                    self.build.failed.discard(filepath)
+                except (InvalidSource, yaml.YAMLError) as error:
+                    # the last valid version stays in the model until the file is fixed
+                    print(error if isinstance(error, InvalidSource) else f'{filepath}: {error}')
+                    self.build.failed.add(filepath)
+
+        pages = self.build.plan(manifest)
+        if pages:
+            # the preview does not need them, the next regular build compresses the pages that changed
+            try:
+                self.build.publish(manifest, pages, compress=False)
+            except Exception as error:
+                # e.g. a code missing from the mapping: the pages not recorded in the graph stay dirty
+                print(f'build failed: {error!r}')
+                return False
+            Metrics.dump(self.build.args.metrics)
+        print(f'rebuilt in {time.perf_counter() - start:.2f} s')
+        return bool(pages)
+
+    def run(self, port: int) -> None:
+        self.stamps = self.snapshot(Watcher.files(Manifest.scan('src')))
+        server = Preview.serve(port) if port else None
+        print('watching src/, templates/ and www/ (ctrl-c to stop)')
+        try:
+            while True:
+                time.sleep(self.interval)
+                if self.poll():
+                    Preview.notify()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if server is not None:
+                server.shutdown()
+
+
+# local preview of public/ for --watch: the pages are served with a small script that reloads
+# them as soon as the watcher publishes a new build
+class Preview(http.server.SimpleHTTPRequestHandler):
+    SCRIPT = b'<script>new EventSource("/__reload").onmessage = function() { location.reload(); };</script>'
+
+    generation: int = 0
+    condition: threading.Condition = threading.Condition()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory='public', **kwargs)
+
+    @staticmethod
+    def serve(port: int) -> http.server.ThreadingHTTPServer:
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', port), Preview)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f'previewing public/ on http://127.0.0.1:{server.server_address[1]}/fr/')
+        return server
+
+    @staticmethod
+    def notify() -> None:
+        with Preview.condition:
+            Preview.generation += 1
+            Preview.condition.notify_all()
+
+    def log_message(self, format, *args):
+        # requests would drown the build log
+        pass
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].split('#', 1)[0]
+        if path == '/__reload':
+            return self.events()
+        filepath = self.translate_path(self.path)
+        if os.path.isdir(filepath) and path.endswith('/'):
+            filepath = os.path.join(filepath, 'index.html')
+        if not filepath.endswith('.html') or not os.path.isfile(filepath):
+            return super().do_GET()
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        head, body, tail = data.rpartition(b'</body>')
+        if body:
+            data = head + Preview.SCRIPT + body + tail
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        generation = Preview.generation
+        try:
+            while True:
+                with Preview.condition:
+                    Preview.condition.wait_for(lambda: Preview.generation != generation, timeout=15)
+                if Preview.generation != generation:
+                    self.wfile.write(b'data: reload\n\n')
+                    self.wfile.flush()
+                    return
+                self.wfile.write(b': keep-alive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+# www/ assets are read and preprocessed once per process, every page shares the same strings
+# in external mode the CSS and JS are written once as content-hashed bundles under public/assets/
+# and linked from every page instead of being inlined
+class Assets:
+    CSS = ['./www/css/bootstrap.min.css', './www/css/syllabus.css', './www/css/katex-fontless.css']
+    JS = ['./www/js/bootstrap.bundle.min.js', './www/js/katex.min.js', './www/js/auto-render.min.js']
+    INLINE = 'inline'
+    EXTERNAL = 'external'
+
+    mode: str = INLINE
+    loaded: bool = False
+    css: list[str] = []
+    js: list[str] = []
+    logo: str = ''
+    download: str = ''
+    bundles: dict[str, str] = {}
+
+    @staticmethod
+    def read(filepath: str) -> str:
+        with open(filepath, 'r') as f:
+            return f.read()
+
+    @staticmethod
+    def load() -> None:
+        if Assets.loaded:
+            return
+        Assets.css = [Assets.read(file) for file in Assets.CSS]
+        Assets.js = [Assets.read(file) for file in Assets.JS]
+
+        logo = Assets.read('www/img/logo/epita.svg')
+        w = re.search('width="([^\"]*)"', logo).group(1)
+        h = re.search('height="([^\"]*)"', logo).group(1)
+        logo = re.sub('width="[^\"]*"', f'viewBox="0 0 {w} {h}"', logo)
+        Assets.logo = re.sub('height="[^\"]*"', '', logo)
+
+        Assets.download = Assets.read('www/img/symbol/download.svg')
+        if Assets.mode == Assets.EXTERNAL:
+            Assets.bundle()
+        Assets.loaded = True
+
+    @staticmethod
+    def bundle() -> None:
+        for kind, contents, separator in [('css', Assets.css, '\n'), ('js', Assets.js, '\n;\n')]:
+            data = separator.join(contents).encode('utf-8')
+            filepath = f'public/assets/syllabus.{hashlib.sha256(data).hexdigest()[:16]}.{kind}'
+            if not os.path.exists(filepath):
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                tmp = f'{filepath}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, filepath)
+            Assets.bundles[kind] = filepath
+
+    @staticmethod
+    def link(kind: str, output: str) -> str:
+        return os.path.relpath(Assets.bundles[kind], os.path.dirname(output)).replace(os.sep, '/')
+
+
+# client-side search: inverted index over the ECUE of a page, built while the panes are laid out,
+# on accent-folded lower-case tokens; terms are sorted so that the page resolves a prefix with a
+# binary search, postings are flat (document, weight) pairs
+class Search:
+    TOKEN = re.compile('[a-z0-9]+')
+    TAG = re.compile('<[^>]*>')
+    LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'ß': 'ss'})
+    STOP = sorted({'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en', 'est', 'et', 'il', 'la', 'le', 'les',
+                   'leur', 'leurs', 'ou', 'par', 'pas', 'pour', 'qui', 'que', 'se', 'sur', 'un', 'une'})
+    SCRIPT = """
+        (function() {
+            var index = JSON.parse(document.getElementById('search-index').textContent);
+            var input = document.getElementById('search-input');
+            var results = document.getElementById('search-results');
+            function tokens(text) {
+                return (text.normalize('NFKD').replace(/[\\u0300-\\u036f]/g, '').toLowerCase().replace(/œ/g, 'oe').replace(/æ/g, 'ae').replace(/ß/g, 'ss').match(/[a-z0-9]+/g) || [])
+                    .filter(function(token) { return token.length > 1 && index.stop.indexOf(token) < 0; });
+            }
+            function lookup(prefix) {
+                var low = 0, high = index.terms.length, scores = {};
+                while (low < high) {
+                    var middle = (low + high) >> 1;
+                    if (index.terms[middle] < prefix) { low = middle + 1; } else { high = middle; }
+                }
+                for (var i = low; i < index.terms.length && index.terms[i].startsWith(prefix); i++) {
+                    var postings = index.postings[i];
+                    for (var j = 0; j < postings.length; j += 2) {
+                        var score = postings[j + 1] * (index.terms[i] === prefix ? 2 : 1);
+                        scores[postings[j]] = Math.max(scores[postings[j]] || 0, score);
+                    }
+                }
+                return scores;
+            }
+            function search(query) {
+                var total = null;
+                tokens(query).forEach(function(token) {
+                    var scores = lookup(token);
+                    if (total === null) { total = scores; return; }
+                    var next = {};
+                    for (var doc in total) { if (doc in scores) { next[doc] = total[doc] + scores[doc]; } }
+                    total = next;
+                });
+                return Object.keys(total || {}).sort(function(a, b) { return total[b] - total[a] || a - b; }).slice(0, 12);
+            }
+            function open(target) {
+                var tab = document.getElementById('tab-' + target);
+                for (var parent = tab.parentElement; parent !== null; parent = parent.parentElement) {
+                    if (parent.classList.contains('collapse')) { bootstrap.Collapse.getOrCreateInstance(parent, { toggle: false }).show(); }
+                }
+                bootstrap.Tab.getOrCreateInstance(tab).show();
+                tab.scrollIntoView({ block: 'nearest' });
+            }
+            input.addEventListener('input', function() {
+                results.replaceChildren();
+                search(input.value).forEach(function(doc) {
+                    var item = document.createElement('button');
+                    var code = document.createElement('code');
+                    item.type = 'button';
+                    item.className = 'list-group-item list-group-item-action small';
+                    item.textContent = index.docs[doc][1] + ' ';
+                    code.textContent = '[' + index.docs[doc][2] + ']';
+                    item.appendChild(code);
+                    item.addEventListener('click', function() { open(index.docs[doc][0]); });
+                    results.appendChild(item);
+                });
+            });
+            input.addEventListener('keydown', function(event) {
+                if (event.key === 'Enter' && results.firstChild !== null) { results.firstChild.click(); }
+                if (event.key === 'Escape') { input.value = ''; results.replaceChildren(); }
+            });
+        })();
+    """
+
+    __slots__ = ['docs', 'postings']
 
     def __init__(self):
-        self.lecture: float = 0.0
-        self.remediation: float = 0.0
-        self.tutorial: float = 0.0
-        self.practical: float = 0.0
-        self.personnal: float = 0.0
-        self.exam: float = 0.0
+        self.docs: list[tuple[str, str, str]] = []
+        self.postings: dict[str, dict[int, int]] = {}
+
+    @staticmethod
+    def tokens(text: str) -> list[str]:
+        folded = unicodedata.normalize('NFKD', Search.TAG.sub(' ', text))
+        folded = ''.join(c for c in folded if not unicodedata.combining(c)).lower().translate(Search.LIGATURES)
+        return [token for token in Search.TOKEN.findall(folded) if len(token) > 1 and token not in Search.STOP]
+
+    def add(self, ecue: ECUE) -> None:
+        doc = len(self.docs)
+        self.docs.append((f'ecue-{ecue.code}', ecue.label, ecue.code))
+        fields = [(ecue.label, 4), (ecue.code.replace('-', ' '), 4), (' '.join(ecue.referents), 2),
+                  (ecue.summary or '', 1), (ecue.outline or '', 1), (ecue.tlo or '', 1)]
+        for text, weight in fields:
+            for token in Search.tokens(text):
+                postings = self.postings.setdefault(token, {})
+                postings[doc] = max(postings.get(doc, 0), weight)
+
+    def serialize(self) -> str:
+        terms = sorted(self.postings)
+        data = {
+            'docs': self.docs,
+            'stop': Search.STOP,
+            'terms': terms,
+            'postings': [[value for item in sorted(self.postings[term].items()) for value in item] for term in terms]
+        }
+        # embedded in a script element, which a closing tag would end early
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+# hours of one row (ECUE, UE, semester or cycle), stored as a fixed layout array of CATEGORIES
+class Stats:
+    CATEGORIES = ('lecture', 'remediation', 'tutorial', 'practical', 'personnal', 'exam')
+    KEYS = CATEGORIES + ('total', 'supervised')
+    INDEX = {category: idx for idx, category in enumerate(CATEGORIES)}
+
+    __slots__ = ['values']
+
+    def __init__(self, values: Any = None):
+        self.values: array = array('d', values if values is not None else bytes(8 * len(Stats.CATEGORIES)))
 
     @property
     def total(self) -> float:
-        return self.lecture + self.remediation + self.tutorial + self.practical + self.personnal + self.exam
+        v = self.values
+        return v[0] + v[1] + v[2] + v[3] + v[4] + v[5]
 
     @property
     def supervised(self) -> float:
-        return self.lecture + self.remediation + self.tutorial + self.practical + self.exam
+        v = self.values
+        return v[0] + v[1] + v[2] + v[3] + v[5]
 
     def __iter__(self):
-        self.__current = 0
-        self.__list = ['lecture', 'remediation', 'tutorial', 'practical', 'personnal', 'exam', 'total', 'supervised']
-        return self
-
-    def __next__(self):
-        if self.__current >= len(self.__list):
-            raise StopIteration
-        self.__current += 1
-        return self.__list[self.__current-1]
+        return iter(Stats.KEYS)
 
     def __iadd__(self, other: Stats) -> Stats:
-        self.lecture += other.lecture
-        self.remediation += other.remediation
-        self.tutorial += other.tutorial
-        self.practical += other.practical
-        self.personnal += other.personnal
-        self.exam += other.exam
+        for idx, value in enumerate(other.values):
+            self.values[idx] += value
         return self
 
     @staticmethod
@@ -175,43 +1723,59 @@ class Stats:
 
     def __getitem__(self, key) -> float:
         match key:
-            case 'lecture': return self.lecture
-            case 'remediation': return self.remediation
-            case 'tutorial': return self.tutorial
-            case 'practical': return self.practical
-            case 'personnal': return self.personnal
-            case 'exam': return self.exam
             case 'total': return self.total
             case 'supervised': return self.supervised
-        raise KeyError(key)
+        if key not in Stats.INDEX:
+            raise KeyError(key)
+        return self.values[Stats.INDEX[key]]
 
     def __str__(self):
-        return f'l:{self.lecture} / r:{self.remediation} / t:{self.tutorial} / p:{self.practical} /h: {self.personnal} / e:{self.exam} / [{self.total} / {self.supervised}]'
+        return ' / '.join(f'{key}: {self[key]}' for key in Stats.KEYS)
+
+    def row(self) -> list[float]:
+        return self.values.tolist() + [self.total, self.supervised]
 
     def update(self, kind: str, value: float) -> Stats:
-        match kind:
-            case 'lecture':
-                self.lecture += value
-            case 'remediation':
-                self.remediation += value
-            case 'tutorial':
-                self.tutorial += value
-            case 'practical':
-                self.practical += value
-            case 'personnal':
-                self.personnal += value
-            case 'exam':
-                self.exam += value
+        if kind in Stats.INDEX:
+            self.values[Stats.INDEX[kind]] += value
         return self
 
+    @staticmethod
+    def group(rows: list[Stats], sizes: list[int]) -> list[Stats]:
+        # sums of consecutive groups of rows, the rows are added in order like the former += cascade
+        if numpy is not None and 0 != len(rows):
+            matrix = numpy.array([row.values for row in rows], dtype=numpy.float64).reshape(len(rows), len(Stats.CATEGORIES))
+            starts = numpy.cumsum([0] + sizes[:-1])
+            present = [size > 0 for size in sizes]
+            sums = iter(numpy.add.reduceat(matrix, starts[present], axis=0).tolist()) if any(present) else iter([])
+            return [Stats(next(sums)) if size > 0 else Stats() for size in sizes]
+        result = []
+        idx = 0
+        for size in sizes:
+            total = Stats()
+            for row in rows[idx:idx + size]:
+                total += row
+            result.append(total)
+            idx += size
+        return result
+
+    @staticmethod
+    def delta(before: list[Stats], after: list[Stats]) -> list[Stats]:
+        # row-wise after - before of two aligned lists of rows
+        if numpy is not None and 0 != len(before):
+            shape = (len(before), len(Stats.CATEGORIES))
+            matrix = numpy.array([row.values for row in after], dtype=numpy.float64).reshape(shape) - numpy.array([row.values for row in before], dtype=numpy.float64).reshape(shape)
+            return [Stats(row) for row in matrix.tolist()]
+        return [Stats([b - a for a, b in zip(first.values, second.values)]) for first, second in zip(before, after)]
+
 
 class Recap:
     def display(self, cycle: Cycle):
+        return Deferred(partial(self.render, cycle))
+
+    def render(self, cycle: Cycle):
         def build_row(_semester: str, _ue: str, _ecue: ECUE):
-            result = [_semester, Tools.tr(_ue.split('-')[-1]), _ecue.label]
-            for k in _ecue.stats:
-                result.append(_ecue.stats[k])
-            return result
+            return [_semester, Tools.tr(_ue.split('-')[-1]), _ecue.label] + _ecue.stats.row()
 
         grid = []
         for semester in sorted(cycle.semesters):
@@ -225,15 +1789,15 @@ class Recap:
                     else:
                         grid.append(build_row(semester, ue, cycle.semesters[semester].ues[ue].ecues[ecue]))
                 line = [semester, Tools.tr(ue.split('-')[-1]), 'Total UE']
-                line.extend([cycle.semesters[semester].ues[ue].stats[k] for k in cycle.semesters[semester].ues[ue].stats])
+                line.extend(cycle.semesters[semester].ues[ue].stats.row())
                 grid.append(line)
             line = [semester, 'Total Semestre', 'Total Semestre']
-            line.extend([cycle.semesters[semester].stats[k] for k in cycle.semesters[semester].stats])
+            line.extend(cycle.semesters[semester].stats.row())
             grid.append(line)
 
-        rows, cols = len(grid), len(grid[0])
-        merged = [[False] * cols for _ in range(rows)]
-        with dt.div(cls='tab-pane fade', id=f'div-recap', role='tabpanel', aria_labelledby=f'tab-recap'):
+        plan = Recap.plan(grid)
+        result = dt.div(cls='tab-pane fade', id=f'div-recap', role='tabpanel', aria_labelledby=f'tab-recap')
+        with result:
             with dt.div(cls='overflow-auto', style="height: 80vh; overflow-y: scroll;"):
                 with dt.table(cls='table table-bordered table-sm', style='vertical-align: middle; '):
                     with dt.thead():
@@ -251,32 +1815,65 @@ class Recap:
                                 if 'SKIP' == line[0]:
                                     dt.td(colspan='11', style='border-left: none; border-right: none; background-color: #00000000;')
                                     continue
-                                cstyle = None
-                                for idy, item in enumerate(line):
-                                    if 1 == idy and item.startswith('Total') and cstyle is None:
-                                        cstyle = 'background-color: #B70D7F33; font-weight: bold; '
-                                    if 2 == idy and item.startswith('Total') and cstyle is None:
-                                        cstyle = 'background-color: #B70D7F11; font-style: italic; '
-                                    if idy > 2:
-                                        if cstyle is None:
-                                            cstyle = "background-color: #F0FDFD; " if idx % 2 == 0 else "background-color: #FFFFFF; "
-                                        dt.td(item if item > 0 else '', style=f'text-align: right; {cstyle};')
-                                    elif not merged[idx][idy]:
-                                        value, rowspan, colspan = grid[idx][idy], 1, 1
-                                        while idx + rowspan < rows and grid[idx + rowspan][idy] == value:
-                                            rowspan += 1
-                                        while idy + colspan < cols and grid[idx][idy + colspan] == value:
-                                            colspan += 1
-                                        for mr in range(rowspan):
-                                            for mc in range(colspan):
-                                                merged[idx + mr][idy + mc] = True
-                                        dt.td(du.raw(item), colspan=(f'{colspan}' if colspan > 1 else ''), rowspan=(f'{rowspan}' if rowspan > 1 else ''), style=('' if idy < 1 else f'{cstyle if cstyle is not None else ""};'), cls='table-secondary' if idy < 1 else '')
+                                # row style as it stands once each label column is reached
+                                styles = [None, None, None]
+                                if line[1].startswith('Total'):
+                                    styles[1] = 'background-color: #B70D7F33; font-weight: bold; '
+                                styles[2] = styles[1]
+                                if styles[2] is None and line[2].startswith('Total'):
+                                    styles[2] = 'background-color: #B70D7F11; font-style: italic; '
+                                for idy, rowspan, colspan in plan[idx]:
+                                    cstyle = styles[idy]
+                                    dt.td(du.raw(line[idy]), colspan=(f'{colspan}' if colspan > 1 else ''), rowspan=(f'{rowspan}' if rowspan > 1 else ''), style=('' if idy < 1 else f'{cstyle if cstyle is not None else ""};'), cls='table-secondary' if idy < 1 else '')
+                                cstyle = styles[2]
+                                if cstyle is None:
+                                    cstyle = "background-color: #F0FDFD; " if idx % 2 == 0 else "background-color: #FFFFFF; "
+                                for item in line[3:]:
+                                    dt.td(item if item > 0 else '', style=f'text-align: right; {cstyle};')
+        return result
+
+    @staticmethod
+    def plan(grid: list[list[Any]], labels: int = 3) -> list[list[tuple[int, int, int]]]:
+        # cells of the label columns are merged with the identical cells below and to their right:
+        # one run-length pass per column (bottom-up) and per row (right to left), then one sweep
+        # emitting (column, rowspan, colspan) for each cell that is not covered by a previous span,
+        # spans only start at or above the current row so the last covered row per column is enough
+        rows, cols = len(grid), len(grid[0])
+        down = [[1] * labels for _ in range(rows)]
+        for idy in range(labels):
+            for idx in range(rows - 2, -1, -1):
+                if grid[idx + 1][idy] == grid[idx][idy]:
+                    down[idx][idy] = down[idx + 1][idy] + 1
+        right = [[1] * labels for _ in range(rows)]
+        for idx in range(rows):
+            run = 1
+            for idy in range(cols - 2, -1, -1):
+                run = run + 1 if grid[idx][idy + 1] == grid[idx][idy] else 1
+                if idy < labels:
+                    right[idx][idy] = run
+
+        covered = [-1] * cols
+        result = []
+        for idx in range(rows):
+            cells = []
+            for idy in range(labels):
+                if covered[idy] >= idx:
+                    continue
+                rowspan, colspan = down[idx][idy], right[idx][idy]
+                for mc in range(colspan):
+                    covered[idy + mc] = max(covered[idy + mc], idx + rowspan - 1)
+                cells.append((idy, rowspan, colspan))
+            result.append(cells)
+        return result
 
     def display_link(self):
         return dt.a(Tools.tr('global-hours'), id=f'tab-recap', cls='btn btn-toggle d-inline-flex align-items-center rounded border-0 collapsed preambule nav-link', data_bs_toggle='tab', data_bs_target=f'#div-recap', aria_selected='true', aria_controls=f'div-recap', role='tab', type='button')
 
 
 class Cycle:
+    # KaTeX auto-render options
+    MATH = '{ delimiters: [{left: "$$", right: "$$", display: true}, {left: "$", right: "$", display: false}, {left: "\\\\(", right: "\\\\)", display: false}, {left: "\\\\[", right: "\\\\]", display: true}], throwOnError : false }'
+
     __slots__ = ['preamble', 'code', 'stats', 'semesters', 'recap']
 
     def __init__(self, code: str):
@@ -288,48 +1885,87 @@ class Cycle:
 
     def add_semester(self, value: Semester) -> Cycle:
         self.semesters[value.code] = value
-        self.stats += value.stats
         return self
 
-    def display(self, year: str = '23'):
+    @staticmethod
+    def assemble(code: str, tree: dict[str, Any]) -> Cycle:
+        result = Cycle(code=code)
+        for semester in sorted(tree):
+            _semester = Semester(code=semester)
+            if type(tree[semester]) == dict:
+                for ue in sorted(tree[semester]):
+                    _ue = tree[semester][ue]['preamble']  # type: UE
+                    # UE objects outlive a build in --watch, their ECUE are gathered again
+                    _ue.ecues = {}
+                    for ecue in sorted(tree[semester][ue]):
+                        if 'preamble' == ecue:
+                            continue
+                        _ue.add_ecue(tree[semester][ue][ecue])
+                    _semester.add_ue(_ue)
+                result.add_semester(_semester)
+            else:
+                result.preamble = tree[semester]
+        return result
+
+    def summarize(self) -> Cycle:
+        # hours totals: ECUE rows grouped by UE, UE totals by semester, semester totals for the cycle
+        semesters = list(self.semesters.values())
+        ues = [ue for semester in semesters for ue in semester.ues.values()]
+        ecues = [ue.flatten() for ue in ues]
+        for ue, stats in zip(ues, Stats.group([ecue.stats for group in ecues for ecue in group], [len(group) for group in ecues])):
+            ue.stats = stats
+        for semester, stats in zip(semesters, Stats.group([ue.stats for ue in ues], [len(semester.ues) for semester in semesters])):
+            semester.stats = stats
+        self.stats = Stats.group([semester.stats for semester in semesters], [len(semesters)])[0]
+        return self
+
+    @staticmethod
+    def output(year: str, code: str) -> str:
+        return f'public/fr/{year}/{code.lower()}/index.html'
+
+    def display(self, year: str = '23', version: str = ''):
         ctitle = f'{Tools.tr("title")} - {Tools.tr(self.code)}'
 
-        ressources = Tools.load_ressources()
+        Assets.load()
+        Lazy.directory = os.path.dirname(Cycle.output(year, self.code))
+        Lazy.clean(Lazy.directory)
+        index = Search()
         result = dominate.document(title=ctitle)
         result['lang'] = Tools.tr('lang')
         with result.head:
             dt.meta(http_equiv='Content-Type', content='text/html; charset=utf-8')
             dt.meta(name='language', content=Tools.tr('lang'))
             dt.meta(name='title', content=ctitle)
-            for css in ressources['css']:
-                dt.style(du.raw(css))
-            for js in ressources['js']:
-                dt.script(du.raw(js))
-            dt.script(du.raw('document.addEventListener("DOMContentLoaded", function() {renderMathInElement(document.body, { delimiters: [{left: "$$", right: "$$", display: true}, {left: "$", right: "$", display: false}, {left: "\\\\(", right: "\\\\)", display: false}, {left: "\\\\[", right: "\\\\]", display: true}], throwOnError : false }); });'))
+            if Assets.mode == Assets.EXTERNAL:
+                dt.link(rel='stylesheet', href=Assets.link('css', Cycle.output(year, self.code)))
+                dt.script(src=Assets.link('js', Cycle.output(year, self.code)))
+            else:
+                for css in Assets.css:
+                    dt.style(du.raw(css))
+                for js in Assets.js:
+                    dt.script(du.raw(js))
+            dt.script(du.raw(f'document.addEventListener("DOMContentLoaded", function() {{renderMathInElement(document.body, {Cycle.MATH}); }});'))
+            if Lazy.enabled:
+                dt.script(du.raw(Lazy.SCRIPT % Cycle.MATH))
 
         result.body['class'] = 'bg-light'
         with result.body:
             with dt.div(cls='container'):
                 with dt.div(cls='row'):
                     with dt.div(cls='col-12'):
-                        with open('www/img/logo/epita.svg') as f:
-                            logo = f.read()
-                        w = re.search('width="([^\"]*)"', logo).group(1)
-                        h = re.search('height="([^\"]*)"', logo).group(1)
-                        logo = re.sub('width="[^\"]*"', f'viewBox="0 0 {w} {h}"', logo)
-                        logo = re.sub('height="[^\"]*"', '', logo)
-
-                        with open('www/img/symbol/download.svg') as f:
-                            dl = f.read()
-
+                        # a page saved in --split mode would only hold empty panes, it has no download link
+                        download = [] if Lazy.enabled else [
+                            dt.a(dt.div(du.raw(Assets.download), style='width: 42px; height: 42px;'), href='#', download=f'Syllabus {Tools.tr(self.code)}.html', id='syllabus-download'),
+                            dt.div(style="width: 16px")
+                        ]
                         dt.h2([
-                            dt.div(du.raw(logo), style='width: 64px; height: 42px;'),
+                            dt.div(du.raw(Assets.logo), style='width: 64px; height: 42px;'),
                             dt.div(style="width: 32px"),
-                            dt.a(dt.div(du.raw(dl), style='width: 42px; height: 42px;'), href='#', download=f'Syllabus {Tools.tr(self.code)}.html', id='syllabus-download'),
-                            dt.div(style="width: 16px"),
-                            dt.span([ctitle, ' ', dt.code(f'(v{datetime.now().strftime("%Y-%m-%d %H:%M:%S")})')], style='color: #102b65; font-size: 1.25em')
+                            *download,
+                            dt.span([ctitle, ' ', dt.code(f'(v{version})')], style='color: #102b65; font-size: 1.25em')
                         ], style='display: flex; vertical-align: middle;')
-                        dt.script("""
+                        if not Lazy.enabled:
+                            dt.script("""
                             document.getElementById('syllabus-download').addEventListener('click', function() {
                                 var htmlContent = document.documentElement.outerHTML;
                                 var blob = new Blob([htmlContent], { type: 'text/html' });
@@ -340,6 +1976,8 @@ class Cycle:
                 dt.br()
                 with dt.div(cls='row'):
                     with dt.div(cls='col-3'):
+                        dt.input_(type='search', id='search-input', cls='form-control form-control-sm mb-1', placeholder=Tools.tr('search'), autocomplete='off')
+                        dt.div(id='search-results', cls='list-group mb-2')
                         with dt.div(cls="sticky-top overflow-auto d-flex mx-auto", style="height: 90vh; overflow-y: scroll;"):
                             with dt.ul(cls='btn-toggle-nav list-unstyled fw-normal pb-1', role='tablist'):
                                 with dt.li(cls='mb-1 nav-item', role='presentation'):
@@ -355,12 +1993,18 @@ class Cycle:
                         with dt.div(cls='tab-content', style='padding-right: 32px'):
                             self.preamble.display(self)
                             for semester in sorted(self.semesters):
-                                self.semesters[semester].display()
+                                self.semesters[semester].display(index)
                             self.recap.display(self)
 
-        os.makedirs(f'public/fr/{year}/{self.code.lower()}', exist_ok=True)
-        with open(f'public/fr/{year}/{self.code.lower()}/index.html', 'w') as f:
-            f.write(str(result))
+            serialized = index.serialize()
+            Metrics.count('bytes:search', len(serialized.encode()))
+            dt.script(du.raw(serialized), type='application/json', id='search-index')
+            dt.script(du.raw(Search.SCRIPT))
+
+        output = Cycle.output(year, self.code)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', buffering=1024 * 1024) as f:
+            result._render(Stream(f), 0, '  ', True, False)
 
 
 class Preamble:
@@ -370,35 +2014,32 @@ class Preamble:
         self.description: str = description
 
     @staticmethod
-    def load(filepath: str) -> Preamble:
-        print(f'loading Preamble: {filepath}')
-        data = Tools.load_yaml(filepath)
+    def load(source: Source, data: Any) -> Preamble:
+        Tools.log(f'loading Preamble: {source.filepath}')
         result = Preamble(description=data['description'])
-        result.filepath = filepath
-        result.code = '-'.join(filepath.split('/')[1:2])
+        result.filepath = source.filepath
+        result.code = source.code
         return result
 
     def display(self, cycle: Cycle):
-        with dt.div(cls='card container tab-pane fade show active', id=f'div-{self.code}-preamble', role='tabpanel', aria_labelledby=f'tab-{self.code}-preamble'):
-            with dt.div(cls='row'):
-                with dt.div(cls='col-12',  style='padding: 0'):
-                    dt.div(Tools.tr('preamble-header'), cls='card-header h3')
-            dt.br()
-            with dt.div(cls='row overflow-auto', style="height: 80vh; overflow-y: scroll;"):
-                with dt.div(cls='col-8', style='padding: 32px;'):
-                    dt.div(du.raw(mistune.html(self.description)))
-                with dt.div(cls='col-4', style='padding-right: 32px'):
-                    with dt.div(cls='sticky-top'):
-
-                        for semester in sorted(cycle.semesters):
-                            with dt.table(cls='table table-bordered', style='vertical-align: middle;'):
-                                with dt.tbody():
-                                    with dt.tr(cls='table-light fw-bold'):
-                                        dt.td([Tools.tr('ects'), ' - ', dt.code(cycle.semesters[semester].code)], colspan='2')
-                                    for ue in sorted(cycle.semesters[semester].ues):
-                                        with dt.tr():
-                                            dt.td([cycle.semesters[semester].ues[ue].label, dt.code(f'[{cycle.semesters[semester].ues[ue].code}]')])
-                                            dt.td(dt.code(cycle.semesters[semester].ues[ue].ects))
+        return Deferred(partial(self.render, cycle))
+
+    def render(self, cycle: Cycle):
+        side = Element('div', Layout.STICKY)
+        for semester in sorted(cycle.semesters):
+            body = Element('tbody', '', Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('ects')), ' - ', Element('code', '', Element.text(cycle.semesters[semester].code)))))
+            for ue in sorted(cycle.semesters[semester].ues):
+                body.add(Element('tr', '',
+                                 Element('td', '', Element.text(cycle.semesters[semester].ues[ue].label), Element('code', '', Element.text(f'[{cycle.semesters[semester].ues[ue].code}]'))),
+                                 Element('td', '', Element('code', '', Element.text(cycle.semesters[semester].ues[ue].ects)))))
+            side.add(Element('table', Layout.TABLE_MIDDLE, body))
+
+        return Element('div', Layout.pane('card container tab-pane fade show active', f'{self.code}-preamble'),
+                       Element('div', Layout.ROW, Element('div', Layout.HEADER_COL, Element('div', Layout.HEADER, Element.text(Tools.tr('preamble-header'))))),
+                       Element('br'),
+                       Element('div', Layout.BODY,
+                               Element('div', Layout.MAIN, Element('div', '', Tools.document(self.description))),
+                               Element('div', Layout.SIDE, side)))
 
     def display_link(self):
         return dt.a(Tools.tr('preamble'), id=f'tab-{self.code}-preamble', cls='btn btn-toggle d-inline-flex align-items-center rounded border-0 collapsed preambule nav-link active', data_bs_toggle='tab', data_bs_target=f'#div-{self.code}-preamble', aria_selected='true', aria_controls=f'div-{self.code}-preamble', role='tab', type='button')
@@ -414,16 +2055,15 @@ class Semester:
 
     def add_ue(self, value: UE) -> Semester:
         self.ues[value.code] = value
-        self.stats += value.stats
         value.semester = self.code
         return self
 
     def __getitem__(self, item: str):
         return self.ues[item]
 
-    def display(self):
+    def display(self, index: Search):
         for ue in self.ues:
-            self.ues[ue].display()
+            self.ues[ue].display(index)
 
     def display_links(self):
         with dt.li(cls='mb-1 ms-3'):
@@ -458,88 +2098,68 @@ class UE:
             self.ecues[splits[2]].append(value)
         else:
             self.ecues[value.code] = value
-        self.stats += value.stats
         value.ue_code = self.code
         value.ue_label = self.label
         return self
 
+    def flatten(self) -> list[ECUE]:
+        result = []
+        for ecue in self.ecues.values():
+            if type(ecue) == list:
+                result.extend(ecue)
+            else:
+                result.append(ecue)
+        return result
+
     @staticmethod
-    def load(filepath: str) -> UE:
-        print(f'loading UE: {filepath}')
-        data = Tools.load_yaml(filepath, 'ue.json')
+    def load(source: Source, data: Any) -> UE:
+        Tools.log(f'loading UE: {source.filepath}')
         result = UE(
-            code=Tools.get_code(filepath),
+            code=source.code,
             label=data['information']['label'],
             level=data['information']['level'],
             ects=data['information']['ects'],
             coordinator=data['information']['coordinator']
         )
         result.stats = Stats()
-        result.filepath = filepath
+        result.filepath = source.filepath
         if 'description' in data:
             result.description = data['description']
         return result
 
-    def display(self):
-        with dt.div(cls='card container tab-pane fade', id=f'div-{self.code}', role='tabpanel', aria_labelledby=f'tab-{self.code}'):
-            with dt.div(cls='row'):
-                with dt.div(cls='col-12',  style='padding: 0'):
-                    dt.div([self.label, ' [', dt.code(self.code), ']'], cls='card-header h3')
-            dt.br()
-            with dt.div(cls='row overflow-auto', style="height: 80vh; overflow-y: scroll;"):
-                with dt.div(cls='col-8', style='padding: 32px;'):
-                    dt.div(du.raw(mistune.html(self.description)))
-
-                with dt.div(cls='col-4', style='padding-right: 32px'):
-                    with dt.div(cls='sticky-top'):
-                        with dt.table(cls='table table-bordered', style='vertical-align: middle;'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('info'), colspan='2')
-                                with dt.tr():
-                                    dt.td(Tools.tr('level'), cls='fw-bold')
-                                    dt.td(dt.code(self.level))
-                                with dt.tr():
-                                    dt.td(Tools.tr('semester'), cls='fw-bold')
-                                    dt.td(dt.code(self.semester))
-                                with dt.tr():
-                                    dt.td(Tools.tr('ects'), cls='fw-bold')
-                                    dt.td(dt.code(self.ects))
-                                with dt.tr():
-                                    dt.td(Tools.tr('coordinator'), cls='fw-bold')
-                                    dt.td(dt.code(self.coordinator))
-
-                        with dt.table(cls='table table-bordered', style='vertical-align: middle;'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('ecue-coefficient'), colspan='2')
-                                for ecue in sorted(self.ecues):
-                                    if type(self.ecues[ecue]) == list:
-                                        for secue in self.ecues[ecue]:
-                                            with dt.tr():
-                                                dt.td([secue.label, dt.code(f'[{secue.code}]')])
-                                                dt.td(dt.code(secue.coefficient))
-                                    else:
-                                        with dt.tr():
-                                            dt.td([self.ecues[ecue].label, dt.code(f'[{self.ecues[ecue].code}]')])
-                                            dt.td(dt.code(self.ecues[ecue].coefficient))
-
-                        with dt.table(cls='table table-bordered'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('info-hours'), colspan='2')
-                                    for cat in self.stats:
-                                        if self.stats[cat] > 0:
-                                            with dt.tr():
-                                                dt.td(Tools.plain(Tools.tr(cat)))
-                                                dt.td(dt.code({Stats.format(self.stats[cat])}), style='text-align: right;')
-
-        for ecue in self.ecues:
-            if type(self.ecues[ecue]) == list:
-                for secue in self.ecues[ecue]:
-                    secue.display()
-            else:
-                self.ecues[ecue].display()
+    def display(self, index: Search):
+        if Lazy.enabled:
+            Lazy('ue', self.code, 'card container tab-pane fade', self.code, self.render)
+        else:
+            Deferred(self.render)
+        for ecue in self.flatten():
+            index.add(ecue)
+            ecue.display()
+
+    def render(self):
+        info = Element('tbody', '',
+                       Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('info')))),
+                       Layout.info(Tools.tr('level'), self.level),
+                       Layout.info(Tools.tr('semester'), self.semester),
+                       Layout.info(Tools.tr('ects'), self.ects),
+                       Layout.info(Tools.tr('coordinator'), self.coordinator))
+
+        coefficients = Element('tbody', '', Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('ecue-coefficient')))))
+        for ecue in sorted(self.ecues):
+            for secue in (self.ecues[ecue] if type(self.ecues[ecue]) == list else [self.ecues[ecue]]):
+                coefficients.add(Element('tr', '',
+                                         Element('td', '', Element.text(secue.label), Element('code', '', Element.text(f'[{secue.code}]'))),
+                                         Element('td', '', Element('code', '', Element.text(secue.coefficient)))))
+
+        return Element('div', Layout.pane('card container tab-pane fade', self.code),
+                       Element('div', Layout.ROW, Element('div', Layout.HEADER_COL, Element('div', Layout.HEADER, Element.text(self.label), ' [', Element('code', '', Element.text(self.code)), ']'))),
+                       Element('br'),
+                       Element('div', Layout.BODY,
+                               Element('div', Layout.MAIN, Element('div', '', Tools.document(self.description))),
+                               Element('div', Layout.SIDE, Element('div', Layout.STICKY,
+                                                                   Element('table', Layout.TABLE_MIDDLE, info),
+                                                                   Element('table', Layout.TABLE_MIDDLE, coefficients),
+                                                                   Layout.hours(self.stats)))))
 
     def display_links(self):
         with dt.li(cls='mb-1 ms-2 nav-item', role='presentation'):
@@ -592,17 +2212,16 @@ class ECUE:
         return self
 
     @staticmethod
-    def load(filepath: str) -> ECUE:
-        print(f'loading ECUE: {filepath}')
-        data = Tools.load_yaml(filepath, schema='ecue.json')
+    def load(source: Source, data: Any) -> ECUE:
+        Tools.log(f'loading ECUE: {source.filepath}')
         result = ECUE(
-            code=Tools.get_code(filepath),
+            code=source.code,
             label=data['information']['label'],
             coefficient=data['information']['coefficient'],
             threshold=data['information']['threshold'],
             referents=data['information']['referents']
         )
-        result.filepath = filepath
+        result.filepath = source.filepath
         if 'prerequisites' in data:
             result.prerequisites = data['prerequisites']
         if 'summary' in data:
@@ -645,141 +2264,98 @@ class ECUE:
         return dt.a(du.raw(self.label + ' <sup><b><code>[ECUE]</code></b></sup>'), cls='nav-link link-body-emphasis text-decoration-none rounded ecue d-block', type='button', role='tab', id=f'tab-ecue-{self.code}', data_bs_target=f'#div-ecue-{self.code}', data_bs_toggle='tab', aria_selected='false', aria_controls=f'div-ecue-{self.code}')
 
     def display(self):
-        print(f'generating ECUE: {self.ue_code} / {self.code}')
-        result = dt.div(cls='card container tab-pane fade', id=f'div-ecue-{self.code}', role='tabpanel', aria_labelledby=f'tab-ecue-{self.code}')
-        with result:
-            with dt.div(cls='row'):
-                with dt.div(cls='col-12', style='padding: 0'):
-                    dt.div([self.label, dt.code(f'[{self.code}]')], cls='card-header h3')
-            dt.br()
-            with dt.div(cls='row overflow-auto', style="height: 80vh; overflow-y: scroll;"):
-                with dt.div(cls='col-8', style='padding: 32px;'):
-                    if self.prerequisites is not None:
-                        dt.div(Tools.tr('prerequisites'), cls='card-title h4')
-                        with dt.div(cls='card-text'):
-                            with dt.ul():
-                                for item in self.prerequisites:
-                                    dt.li(Tools.plain(item))
-                        Tools.separate()
-                    if self.summary is not None:
-                        dt.div(Tools.tr('summary'), cls='card-title h4')
-                        dt.div(Tools.plain(self.summary), cls='card-text')
-                        Tools.separate()
-                    if self.outline is not None:
-                        dt.div(Tools.tr('outline'), cls='card-title h4')
-                        dt.div(Tools.plain(self.outline), cls='card-text')
-                        Tools.separate()
-                    if self.tlo is not None:
-                        dt.div(Tools.tr('tlo'), cls='card-title h4')
-                        with dt.div(cls='card-text'):
-                            dt.p(Tools.plain(Tools.tr('tlo-intro')))
-                            dt.div(Tools.plain(self.tlo), cls='card-text')
-                        Tools.separate()
-                    if 0 != len(self.activities):
-                        dt.div(Tools.tr('activities'), cls='card-title h4')
-                        with dt.div(cls='card-text'):
-                            with dt.ul():
-                                for item in self.activities:
-                                    if item.label is not None:
-                                        dt.li(Tools.plain(item.label))
-                        Tools.separate()
-                    if 0 != len(self.evaluations):
-                        dt.div(Tools.tr('evaluations'), cls='card-title h4')
-                        with dt.table(cls='table table-bordered'):
-                            with dt.thead(cls='table-light'):
-                                dt.tr([
-                                    dt.td(Tools.tr('evaluations-label')),
-                                    dt.td(Tools.tr('evaluations-kind')),
-                                    dt.td(Tools.tr('evaluations-environment')),
-                                    dt.td(Tools.tr('evaluations-code')),
-                                    dt.td(Tools.tr('evaluations-comments'))
-                                ])
-                            with dt.tbody():
-                                for item in self.evaluations:
-                                    dt.tr([
-                                        dt.td(item.label),
-                                        dt.td(Tools.tr(item.kind)),
-                                        dt.td(Tools.tr(item.environment)),
-                                        dt.td(dt.code(f'[{item.code}]')),
-                                        dt.td(Tools.plain(item.comments) if item.comments is not None else '')
-                                    ])
-                        dt.br()
-                        dt.div(Tools.tr('grading'), cls='card-title h4')
-                        grade = [dt.code(f'[{Tools.tr("grading-grade")}]'), ' = ']
-                        for idx, item in enumerate(self.evaluations):
-                            if 0 != idx:
-                                grade.append(' + ')
-                            grade.append(f'{item.coefficient:.0%}')
-                            grade.append(dt.code(f'[{item.code}]'))
-                        dt.div(grade, cls='card-text')
-                        Tools.separate()
-
-                    if 0 != len(self.references):
-                        dt.div(Tools.tr('references'), cls='card-title h4')
-                        with dt.div(cls='card-text'):
-                            with dt.ul():
-                                for item in self.references:
-                                    match item.kind:
-                                        case 'link':
-                                            dt.li(dt.a(item.label, href=item.url, target='_blank'))
-                                        case 'book':
-                                            dt.li([item.label, ' (', dt.a(item.isbn13, href=f'https://www.google.com/search?q={item.isbn13}', target='_blank'), ' )'])
-                                        case 'other':
-                                            dt.li(item.label)
-                        Tools.separate()
-
-                    if self.others is not None:
-                        dt.div(Tools.tr('others'), cls='card-title h4')
-                        dt.div(Tools.plain(self.others), cls='card-text')
-
-                with dt.div(cls='col-4', style='padding-right: 32px'):
-                    with dt.div(cls='sticky-top'):
-                        with dt.table(cls='table table-bordered', style='vertical-align: middle;'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('info'), colspan='2')
-                                with dt.tr():
-                                    dt.td('UE', cls='fw-bold')
-                                    dt.td([
-                                        self.ue_label,
-                                        dt.br(),
-                                        dt.code(f'[{self.ue_code}]')
-                                    ])
-                                with dt.tr():
-                                    dt.td('ECUE', cls='fw-bold')
-                                    dt.td([
-                                        self.label,
-                                        dt.br(),
-                                        dt.code(f'[{self.code}]')
-                                    ])
-                                with dt.tr():
-                                    dt.td(Tools.tr('info-coefficient'), cls='fw-bold')
-                                    dt.td(dt.code(self.coefficient))
-                                with dt.tr():
-                                    dt.td(Tools.tr('info-threshold'), cls='fw-bold')
-                                    dt.td(dt.code(self.threshold))
-                        with dt.table(cls='table table-bordered'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('referent') + ('' if 1 == len(self.referents) else 's'), colspan='2')
-                                with dt.tr():
-                                    with dt.td():
-                                        with dt.ul():
-                                            for item in self.referents:
-                                                dt.li(item)
-                        with dt.table(cls='table table-bordered'):
-                            with dt.tbody():
-                                with dt.tr(cls='table-light fw-bold'):
-                                    dt.td(Tools.tr('info-hours'), colspan='2')
-                                    for cat in self.stats:
-                                        if self.stats[cat] > 0:
-                                            with dt.tr(cls=('table-light' if cat in ['total', 'supervised'] else '') + (' fw-bold' if cat in ['total'] else '')):
-                                                dt.td(Tools.plain(Tools.tr(cat)))
-                                                dt.td(dt.code({Stats.format(self.stats[cat])}), style='text-align: right;')
-                        dt.br()
-                        dt.br()
-
-        return result
+        if Lazy.enabled:
+            return Lazy('ecue', self.code, 'card container tab-pane fade', f'ecue-{self.code}', self.fragment)
+        return self.fragment()
+
+    def fragment(self):
+        key = '\0'.join([Tools.digest(self.filepath), Tools.digest('templates/mapping.yml'), Tools.digest(__file__), self.ue_code, self.ue_label])
+        return Fragment(key, self.render)
+
+    def render(self):
+        Tools.log(f'generating ECUE: {self.ue_code} / {self.code}')
+        main = Element('div', Layout.MAIN)
+        if self.prerequisites is not None:
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('prerequisites'))),
+                     Element('div', Layout.CARD_TEXT, Element('ul', '', *[Element('li', '', Tools.render(item)) for item in self.prerequisites])),
+                     *Element.separate())
+        if self.summary is not None:
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('summary'))),
+                     Element('div', Layout.CARD_TEXT, Tools.render(self.summary)),
+                     *Element.separate())
+        if self.outline is not None:
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('outline'))),
+                     Element('div', Layout.CARD_TEXT, Tools.render(self.outline)),
+                     *Element.separate())
+        if self.tlo is not None:
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('tlo'))),
+                     Element('div', Layout.CARD_TEXT,
+                             Element('p', '', Tools.render(Tools.tr('tlo-intro'))),
+                             Element('div', Layout.CARD_TEXT, Tools.render(self.tlo))),
+                     *Element.separate())
+        if 0 != len(self.activities):
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('activities'))),
+                     Element('div', Layout.CARD_TEXT, Element('ul', '', *[Element('li', '', Tools.render(item.label)) for item in self.activities if item.label is not None])),
+                     *Element.separate())
+        if 0 != len(self.evaluations):
+            head = Element('tr', '', *[Element('td', '', Element.text(Tools.tr(key))) for key in ['evaluations-label', 'evaluations-kind', 'evaluations-environment', 'evaluations-code', 'evaluations-comments']])
+            body = Element('tbody', '', *[Element('tr', '',
+                                                  Element('td', '', Element.text(item.label)),
+                                                  Element('td', '', Element.text(Tools.tr(item.kind))),
+                                                  Element('td', '', Element.text(Tools.tr(item.environment))),
+                                                  Element('td', '', Element('code', '', Element.text(f'[{item.code}]'))),
+                                                  Element('td', '', Tools.render(item.comments) if item.comments is not None else '')) for item in self.evaluations])
+            grade = Element('div', Layout.CARD_TEXT, Element('code', '', Element.text(f'[{Tools.tr("grading-grade")}]')), ' = ')
+            for idx, item in enumerate(self.evaluations):
+                if 0 != idx:
+                    grade.add(' + ')
+                grade.add(Element.text(f'{item.coefficient:.0%}'), Element('code', '', Element.text(f'[{item.code}]')))
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('evaluations'))),
+                     Element('table', Layout.TABLE, Element('thead', Layout.TABLE_HEAD, head), body),
+                     Element('br'),
+                     Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('grading'))),
+                     grade,
+                     *Element.separate())
+
+        if 0 != len(self.references):
+            references = Element('ul')
+            for item in self.references:
+                match item.kind:
+                    case 'link':
+                        references.add(Element('li', '', Element('a', Element.attrs(href=item.url, target='_blank'), Element.text(item.label))))
+                    case 'book':
+                        references.add(Element('li', '', Element.text(item.label), ' (', Element('a', Element.attrs(href=f'https://www.google.com/search?q={item.isbn13}', target='_blank'), Element.text(item.isbn13)), ' )'))
+                    case 'other':
+                        references.add(Element('li', '', Element.text(item.label)))
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('references'))),
+                     Element('div', Layout.CARD_TEXT, references),
+                     *Element.separate())
+
+        if self.others is not None:
+            main.add(Element('div', Layout.CARD_TITLE, Element.text(Tools.tr('others'))),
+                     Element('div', Layout.CARD_TEXT, Tools.render(self.others)))
+
+        info = Element('tbody', '',
+                       Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('info')))),
+                       Element('tr', '', Element('td', Layout.LABEL_CELL, 'UE'), Element('td', '', Element.text(self.ue_label), Element('br'), Element('code', '', Element.text(f'[{self.ue_code}]')))),
+                       Element('tr', '', Element('td', Layout.LABEL_CELL, 'ECUE'), Element('td', '', Element.text(self.label), Element('br'), Element('code', '', Element.text(f'[{self.code}]')))),
+                       Layout.info(Tools.tr('info-coefficient'), self.coefficient),
+                       Layout.info(Tools.tr('info-threshold'), self.threshold))
+        referents = Element('tbody', '',
+                            Element('tr', Layout.TABLE_TITLE, Element('td', Layout.TITLE_CELL, Element.text(Tools.tr('referent') + ('' if 1 == len(self.referents) else 's')))),
+                            Element('tr', '', Element('td', '', Element('ul', '', *[Element('li', '', Element.text(item)) for item in self.referents]))))
+
+        return Element('div', Layout.pane('card container tab-pane fade', f'ecue-{self.code}'),
+                       Element('div', Layout.ROW, Element('div', Layout.HEADER_COL, Element('div', Layout.HEADER, Element.text(self.label), Element('code', '', Element.text(f'[{self.code}]'))))),
+                       Element('br'),
+                       Element('div', Layout.BODY,
+                               main,
+                               Element('div', Layout.SIDE, Element('div', Layout.STICKY,
+                                                                   Element('table', Layout.TABLE_MIDDLE, info),
+                                                                   Element('table', Layout.TABLE, referents),
+                                                                   Layout.hours(self.stats, highlight=True),
+                                                                   Element('br'),
+                                                                   Element('br')))))
 
 
 class Activity:
@@ -815,45 +2391,44 @@ class Reference:
 
 
 def main():
+    parser = argparse.ArgumentParser(description='EPITA syllabus generator')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes used to load the sources and render the pages (0: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the parse and fragment caches (.cache/syllabus, .cache/fragments): sources are parsed, validated and rendered again, but unchanged pages are still skipped unless --force')
+    parser.add_argument('--force', action='store_true', help='render every page, even when its inputs did not change')
+    parser.add_argument('--split', action='store_true', help='write every UE/ECUE pane to its own file, fetched when its tab is first opened (the pages must be served over HTTP and have no download link)')
+    parser.add_argument('--no-compress', action='store_true', help='do not write the pre-compressed .gz/.br siblings of the pages')
+    parser.add_argument('--assets', choices=[Assets.INLINE, Assets.EXTERNAL], default=Assets.INLINE, help='inline CSS/JS in every page (self-contained download) or link a shared bundle from public/assets/')
+    parser.add_argument('--watch', action='store_true', help='keep running: re-render the pages whose inputs change and serve public/ with live reload')
+    parser.add_argument('--port', type=int, default=8000, help='port of the --watch preview server (0: no server)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log every loaded, rendered, exported and compressed file')
+    parser.add_argument('--metrics', default='.cache/metrics.json', help='JSON file receiving the timers and counters of the build')
+    parser.add_argument('--profile', action='store_true', help='run the build under cProfile and tracemalloc, in this process only (implies --jobs 1)')
+    args = parser.parse_args()
+
+    Metrics.reset()
+    Tools.verbose = args.verbose
     Tools.load_mapping('templates/mapping.yml')
-
-    syllabus = {}
-    files = subprocess.run(['find', '-L', f'src', '-name', '[^.]*.yml'], stdout=subprocess.PIPE).stdout.decode('utf-8').splitlines()
-    for file in files:
-        Tools.store(syllabus, ECUE.load(file), file)
-
-    files = subprocess.run(['find', '-L', f'src', '-name', '*.ue.yml'], stdout=subprocess.PIPE).stdout.decode('utf-8').splitlines()
-    for file in files:
-        Tools.store(syllabus, UE.load(file), file)
-
-    files = subprocess.run(['find', '-L', f'src', '-name', '*.preamble.yml'], stdout=subprocess.PIPE).stdout.decode('utf-8').splitlines()
-    for file in files:
-        Tools.store(syllabus, Preamble.load(file), file)
-
-    years = {}
-    for year in sorted(syllabus):
-        for cycle in sorted(syllabus[year]):
-            _cycle = Cycle(code=cycle)  # type: Cycle
-            for semester in sorted(syllabus[year][cycle]):
-                _semester = Semester(code=semester)
-                if type(syllabus[year][cycle][semester]) == dict:
-                    for ue in sorted(syllabus[year][cycle][semester]):
-                        _ue = syllabus[year][cycle][semester][ue]['preamble']  # type: UE
-                        for ecue in sorted(syllabus[year][cycle][semester][ue]):
-                            if 'preamble' == ecue:
-                                continue
-                            _ue.add_ecue(syllabus[year][cycle][semester][ue][ecue])
-                        _semester.add_ue(_ue)
-                    _cycle.add_semester(_semester)
-                else:
-                    _cycle.preamble = syllabus[year][cycle][semester]
-            if year not in years:
-                years[year] = []
-            years[year].append(_cycle)
-
-    for year in years:
-        for cycle in years[year]:
-            cycle.display()
+    Assets.mode = args.assets
+    Lazy.enabled = args.split
+    if not args.no_cache:
+        Fragment.cache = DiskCache('.cache/fragments', 'syllabus-fragment-1')
+    profile = None
+    if args.profile:
+        # workers would not be profiled
+        args.jobs = 1
+        profile = Profile()
+        profile.start()
+
+    build = Build(args)
+    with Metrics.timer('phase:discovery'):
+        manifest = Manifest.scan('src')
+    pages = build.plan(manifest)
+    # the watcher keeps the whole model, pages skipped now may be the next ones to render
+    build.load([source for source in manifest.sources if args.watch or (source.year, source.cycle) in pages])
+    build.publish(manifest, pages)
+    Metrics.dump(args.metrics, **(profile.stop() if profile is not None else {}))
+    if args.watch:
+        Watcher(build).run(args.port)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import dominate.tags as dt
+import dominate.util as du
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from syllabus import Build, Element, Fragment, Lazy, Manifest, Tools  # noqa: E402
+
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+DIGESTS = os.path.join(GOLDEN, 'panes.json')
+# panes kept in full, for a readable diff: preamble, UE, ECUE without prerequisites, with book, link
+# and other references, with evaluation comments, grouped under a sub-menu and with others
+SAMPLES = ['23/pc/preamble', '23/pc/ue/23-PC-S1-ALGO', '23/pc/ecue/ALGO-S1-2-CAML', '23/pc/ecue/ALGO-S2-2-ABG',
+           '23/pc/ecue/SH-S2-ACF-1-CO', '23/pa/ecue/SI-S2-NTS-1-ARVR']
+
+
+def render(tag, level: int = 0) -> str:
+    return ''.join(tag._render([], level, '  ', True, False))
+
+
+def panes() -> dict[str, str]:
+    # every preamble, UE and ECUE pane of src/, as rendered in the pages (no cache, no --split)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        Tools.load_mapping('templates/mapping.yml')
+        Tools.verbose = False
+        Fragment.cache = None
+        Lazy.enabled = False
+        build = Build(argparse.Namespace(force=True, jobs=1, no_cache=True, assets='inline', split=False))
+        manifest = Manifest.scan('src')
+        build.load(manifest.sources)
+        result = {}
+        for year, cycle in build.assemble(manifest, set(manifest.cycles())):
+            prefix = f'{year}/{cycle.code.lower()}'
+            result[f'{prefix}/preamble'] = render(cycle.preamble.render(cycle))
+            for semester in cycle.semesters.values():
+                for ue in semester.ues.values():
+                    result[f'{prefix}/ue/{ue.code}'] = render(ue.render())
+                    for ecue in ue.flatten():
+                        result[f'{prefix}/ecue/{ecue.code}'] = render(ecue.render())
+        return result
+    finally:
+        os.chdir(cwd)
+
+
+def sample(name: str) -> str:
+    return os.path.join(GOLDEN, name.replace('/', '-') + '.html')
+
+
+@pytest.fixture(scope='module')
+def rendered() -> dict[str, str]:
+    return panes()
+
+
+def test_pane_digests(rendered):
+    with open(DIGESTS) as f:
+        expected = json.load(f)
+    actual = {name: hashlib.sha256(html.encode('utf-8')).hexdigest() for name, html in rendered.items()}
+    assert sorted(actual) == sorted(expected)
+    assert [name for name in sorted(actual) if actual[name] != expected[name]] == []
+
+
+@pytest.mark.parametrize('name', SAMPLES)
+def test_pane_sample(rendered, name):
+    with open(sample(name), encoding='utf-8') as f:
+        assert rendered[name] == f.read()
+
+
+# the fast emitter against dominate on what the section renderers rely on
+CASES = {
+    'attributes': lambda: (
+        Element('a', Element.attrs(cls='btn nav-link', data_bs_toggle='tab', aria_controls='div-1', id='tab-1', type='button', role='tab'), Element.text('Tab')),
+        dt.a('Tab', cls='btn nav-link', data_bs_toggle='tab', aria_controls='div-1', id='tab-1', type='button', role='tab')),
+    'escaping': lambda: (
+        Element('div', Element.attrs(title='a "b" & <c>'), Element.text('Label & <b> "quoted" \'single\'')),
+        dt.div('Label & <b> "quoted" \'single\'', title='a "b" & <c>')),
+    'numbers': lambda: (
+        Element('td', '', Element('code', '', Element.text(3)), Element('code', '', Element.text(0.25))),
+        dt.td(dt.code(3), dt.code(0.25))),
+    'raw': lambda: (
+        Element('div', Element.attrs(cls='card-text'), '<p>markdown &amp; <em>html</em></p>\n'),
+        dt.div(du.raw('<p>markdown &amp; <em>html</em></p>\n'), cls='card-text')),
+    'inline': lambda: (
+        Element('div', '', Element.text('before'), Element('br'), Element('i', '', Element.text('italic')), Element.text('after')),
+        dt.div('before', dt.br(), dt.i('italic'), 'after')),
+    'mixed': lambda: (
+        Element('td', '', Element.text('Label'), ' ', Element('code', '', Element.text('[CODE]'))),
+        dt.td('Label', ' ', dt.code('[CODE]'))),
+    'void': lambda: (
+        Element('div', '', Element('br'), Element('hr'), Element('img', Element.attrs(src='a.png', alt='')), Element('br')),
+        dt.div(dt.br(), dt.hr(), dt.img(src='a.png', alt=''), dt.br())),
+    'unformatted': lambda: (
+        Element('pre', '', Element('code', '', Element.text('a\n  b')), Element('span', '', Element.text('c'))),
+        dt.pre(dt.code('a\n  b'), dt.span('c'))),
+    'empty': lambda: (
+        Element('div', '', Element('ul', ''), Element('div', Element.attrs(cls='x'))),
+        dt.div(dt.ul(), dt.div(cls='x'))),
+    'nested': lambda: (
+        Element('table', Element.attrs(cls='table table-bordered', style='vertical-align: middle;'),
+                Element('tbody', '', Element('tr', Element.attrs(cls='table-light fw-bold'), Element('td', Element.attrs(colspan='2'), Element.text('Title'))),
+                        Element('tr', '', Element('td', Element.attrs(cls='fw-bold'), Element.text('Key')), Element('td', '', Element('code', '', Element.text('value')))))),
+        dt.table(dt.tbody(dt.tr(dt.td('Title', colspan='2'), cls='table-light fw-bold'),
+                          dt.tr(dt.td('Key', cls='fw-bold'), dt.td(dt.code('value')))), cls='table table-bordered', style='vertical-align: middle;')),
+    'list': lambda: (
+        Element('ul', '', *[Element('li', '', '<p>item</p>\n') for _ in range(2)]),
+        dt.ul([dt.li(du.raw('<p>item</p>\n')) for _ in range(2)])),
+}
+
+
+@pytest.mark.parametrize('level', [0, 1, 3])
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_element_matches_dominate(case, level):
+    element, reference = CASES[case]()
+    assert render(element, level) == render(reference, level)
+
+
+if __name__ == '__main__':
+    # rewrite the golden files from the current renderers, once their output was checked by hand
+    current = panes()
+    os.makedirs(GOLDEN, exist_ok=True)
+    with open(DIGESTS, 'w') as f:
+        json.dump({name: hashlib.sha256(html.encode('utf-8')).hexdigest() for name, html in sorted(current.items())}, f, indent=1)
+        f.write('\n')
+    for name in SAMPLES:
+        with open(sample(name), 'w', encoding='utf-8') as f:
+            f.write(current[name])